@@ -0,0 +1,24 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from splitnode import text_to_textnodes, text_to_textnodes_multipass
+
+PARAGRAPH = (
+    "This is **bold** text with an _italic_ word, some `inline code`, "
+    "a [link](https://boot.dev) and an ![image](/images/tom.png) in it. "
+    "Plain prose follows so the paragraph looks like real writing. "
+)
+
+def main():
+    text = PARAGRAPH * 20
+    paragraphs = 2000
+    assert text_to_textnodes(text) == text_to_textnodes_multipass(text)
+    for name, func in (("multipass", text_to_textnodes_multipass), ("single pass", text_to_textnodes)):
+        seconds = min(timeit.repeat(lambda: func(text), number=paragraphs, repeat=5))
+        print(f"{name:>12}: {seconds * 1000:8.1f} ms for {paragraphs} paragraphs ({len(text)} chars each)")
+
+if __name__ == "__main__":
+    main()
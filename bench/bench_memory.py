@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+from markdown import markdown_to_html_node
+from generatepage import render_page, stream_page
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+# Subclasses without __slots__ get a per-instance __dict__ again, like the old classes.
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+class DictParentNode(ParentNode):
+    pass
+
+def instance_size(node):
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+def synthetic_page(paragraphs):
+    block = (
+        "## Section {i}\n\n"
+        "Paragraph {i} has **bold**, _italic_, `code`, a [link](/blog/{i}) and ![an image](/images/{i}.png).\n\n"
+        "- item one\n- item two with **bold**\n- item three\n\n"
+        "> a quote about section {i}\n\n"
+    )
+    return "# Synthetic page\n\n" + "".join(block.format(i=i) for i in range(paragraphs))
+
+def measure_tree(markdown):
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return node, size, peak
+
+class NullSink:
+    def write(self, text):
+        pass
+
+def measure_render(path):
+    # Peak memory from reading the file to the last byte written, for both render paths.
+    results = {}
+    tracemalloc.start()
+    with open(path, "r", encoding="utf-8") as f:
+        render_page(f.read(), TEMPLATE, NullSink())
+    results["in memory"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    stream_page(path, TEMPLATE, NullSink())
+    results["streamed"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+def main():
+    pairs = (
+        ("TextNode", TextNode("text", TextType.TEXT), DictTextNode("text", TextType.TEXT)),
+        ("LeafNode", LeafNode("b", "text"), DictLeafNode("b", "text")),
+        ("ParentNode", ParentNode("p", [LeafNode(None, "x")]), DictParentNode("p", [LeafNode(None, "x")])),
+    )
+    print("Per-node footprint (bytes, instance + __dict__):")
+    for name, slotted, dict_backed in pairs:
+        print(f"  {name:>10}: slots {instance_size(slotted):4d}   dict {instance_size(dict_backed):4d}")
+
+    markdown = synthetic_page(5000)
+    node, size, peak = measure_tree(markdown)
+    print(f"Synthetic page: {len(markdown) / 1e6:.1f} MB markdown, {count_nodes(node)} HTML nodes")
+    print(f"  AST retained: {size / 1e6:.1f} MB   peak while parsing: {peak / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        print("Peak memory rendering the same page:")
+        for name, peak in measure_render(path).items():
+            print(f"  {name:>10}: {peak / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import io
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_markdown
+from generatepage import url_rewriter
+from markdown import blocks_to_page
+from markdownblock import iter_blocks
+from template import load_template
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+def render(template, title, node, minify):
+    sink = io.StringIO()
+    template.write(sink, {"Title": title, "Content": node}, minify, url_rewriter("/ssg/"))
+    return sink.getvalue()
+
+def main():
+    rng = random.Random(0)
+    template = load_template(TEMPLATE)
+    pages = []
+    for _ in range(50):
+        markdown = generate_markdown(rng, paragraphs=40)
+        pages.append(blocks_to_page(iter_blocks(markdown.split("\n"))))
+
+    sizes = {}
+    times = {}
+    for minify in (False, True):
+        sizes[minify] = sum(len(render(template, title, node, minify).encode("utf-8")) for title, node in pages)
+        times[minify] = min(timeit.repeat(lambda: [render(template, title, node, minify) for title, node in pages], number=5, repeat=5)) / 5
+
+    megabytes = sizes[False] / (1024 * 1024)
+    saved = sizes[False] - sizes[True]
+    print(f"   plain: {sizes[False]:>9} bytes, {times[False] * 1000:7.1f} ms for {len(pages)} pages ({megabytes / times[False]:.1f} MB/s)")
+    print(f"minified: {sizes[True]:>9} bytes, {times[True] * 1000:7.1f} ms for {len(pages)} pages ({megabytes / times[True]:.1f} MB/s)")
+    print(f"   saved: {saved} bytes ({100 * saved / sizes[False]:.1f}%), cost {(times[True] - times[False]) * 1000 / megabytes:+.1f} ms per MB of output")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron lord of mordor "
+    "elves of rivendell sang songs under starlight while hobbits of the shire tended gardens "
+    "glorfindel rode swiftly across the ford as the riders drew near tom bombadil laughed"
+).split()
+
+def sentence(rng, inline_density, words=12):
+    parts = []
+    for _ in range(rng.randint(words // 2, words)):
+        word = rng.choice(WORDS)
+        if rng.random() < inline_density:
+            kind = rng.randrange(5)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"_{word}_"
+            elif kind == 2:
+                word = f"`{word}`"
+            elif kind == 3:
+                word = f"[{word}](/blog/{rng.choice(WORDS)})"
+            else:
+                word = f"![{word}](/images/{rng.choice(WORDS)}.png)"
+        parts.append(word)
+    return " ".join(parts).capitalize() + "."
+
+def generate_markdown(rng, paragraphs=20, inline_density=0.15, list_ratio=0.15, code_ratio=0.1, image_ratio=0.05):
+    blocks = [f"# {sentence(rng, 0, 6)[:-1]}"]
+    for i in range(paragraphs):
+        roll = rng.random()
+        if i and i % 5 == 0:
+            blocks.append(f"## {sentence(rng, 0, 5)[:-1]}")
+        if roll < list_ratio:
+            ordered = rng.random() < 0.5
+            items = [sentence(rng, inline_density, 8) for _ in range(rng.randint(2, 6))]
+            blocks.append("\n".join(f"{n + 1}. {item}" if ordered else f"- {item}" for n, item in enumerate(items)))
+        elif roll < list_ratio + code_ratio:
+            code = "\n".join(f"    value_{n} = compute({n})" for n in range(rng.randint(3, 12)))
+            blocks.append(f"```\n{code}\n```")
+        elif roll < list_ratio + code_ratio + image_ratio:
+            blocks.append(f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)")
+        elif roll < list_ratio + code_ratio + image_ratio + 0.05:
+            blocks.append("\n".join(f"> {sentence(rng, inline_density)}" for _ in range(rng.randint(1, 3))))
+        else:
+            blocks.append("\n".join(sentence(rng, inline_density) for _ in range(rng.randint(2, 6))))
+    return "\n\n".join(blocks) + "\n"
+
+def generate_corpus(dest_dir, pages=100, seed=0, **options):
+    # Same seed and options always give byte-identical pages, so runs are comparable.
+    rng = random.Random(seed)
+    paths = []
+    for i in range(pages):
+        rel_dir = "" if i == 0 else os.path.join("blog", f"post{i:05d}")
+        path = os.path.join(dest_dir, rel_dir, "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_markdown(rng, **options))
+        paths.append(path)
+    return paths
+
+def generate_assets(dest_dir, files=20, size=256 * 1024, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(dest_dir, "images"), exist_ok=True)
+    with open(os.path.join(dest_dir, "index.css"), "w", encoding="utf-8") as f:
+        f.write("body { margin: 0 auto; max-width: 40em; }\n" * 50)
+    for i in range(files):
+        with open(os.path.join(dest_dir, "images", f"image{i:03d}.png"), "wb") as f:
+            f.write(rng.randbytes(size))
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic markdown corpus.")
+    parser.add_argument("dest")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--inline-density", type=float, default=0.15)
+    parser.add_argument("--list-ratio", type=float, default=0.15)
+    parser.add_argument("--code-ratio", type=float, default=0.1)
+    parser.add_argument("--image-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(
+        args.dest, args.pages, args.seed, paragraphs=args.paragraphs, inline_density=args.inline_density,
+        list_ratio=args.list_ratio, code_ratio=args.code_ratio, image_ratio=args.image_ratio,
+    )
+    print(f"Wrote {len(paths)} pages to {args.dest}")
+
+if __name__ == "__main__":
+    main()
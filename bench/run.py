@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from assets import sync_assets
+from corpus import generate_assets, generate_corpus
+from linkcheck import page_links
+from searchindex import add_postings
+from markdown import markdown_to_html_node
+from markdownblock import markdown_to_blocks, block_to_block_type, iter_blocks, BlockType
+from splitnode import text_to_textnodes
+from template import compile_template
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet" /></head>
+  <body><article>{{ Content }}</article></body>
+</html>
+"""
+
+def best_of(repeat, func):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def run_stages(root, pages, repeat, asset_files, seed=0, **options):
+    # options are generate_markdown()'s shape knobs: paragraphs, inline_density and the block ratios.
+    content = os.path.join(root, "content")
+    paths = generate_corpus(content, pages, seed, **options)
+    texts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    blocks = [block for text in texts for block in markdown_to_blocks(text)]
+    typed = [(block, block_to_block_type(block)) for block in blocks]
+    inline_texts = [block for block, block_type in typed if block_type != BlockType.code]
+    trees = [markdown_to_html_node(text) for text in texts]
+    page_blocks = [list(iter_blocks(text.split("\n"))) for text in texts]
+    bodies = [tree.to_html() for tree in trees]
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+    template = compile_template(template_path)
+    out_dir = os.path.join(root, "out")
+    os.makedirs(out_dir, exist_ok=True)
+
+    def file_io():
+        for i, body in enumerate(bodies):
+            path = os.path.join(out_dir, f"{i}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(body)
+            with open(path, encoding="utf-8") as f:
+                f.read()
+
+    static = os.path.join(root, "static")
+    generate_assets(static, asset_files)
+    counter = iter(range(1 << 30))
+
+    def asset_copy():
+        # A fresh target and manifest each time so every repeat is a full copy.
+        n = next(counter)
+        sync_assets(static, os.path.join(root, f"docs{n}"), manifest_file=os.path.join(root, f"assets{n}.json"))
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(text) for text in texts],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "text_to_textnodes": lambda: [text_to_textnodes(text) for text in inline_texts],
+        "markdown_to_html_node": lambda: [markdown_to_html_node(text) for text in texts],
+        "page_links": lambda: [page_links(page, tree) for page, tree in zip(page_blocks, trees)],
+        "search_postings": lambda: [add_postings({}, tree) for tree in trees],
+        "to_html": lambda: [tree.to_html() for tree in trees],
+        "template_fill": lambda: [template.render({"Title": "Title", "Content": body}) for body in bodies],
+        "file_io": file_io,
+        "asset_copy": asset_copy,
+    }
+    stdout = sys.stdout
+    results = {}
+    for name, func in stages.items():
+        sys.stdout = open(os.devnull, "w")
+        try:
+            results[name] = best_of(repeat, func)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        print(f"{name:>22}: {results[name] * 1000:9.2f} ms")
+    corpus = {"pages": pages, "seed": seed, **options, "bytes": sum(len(text) for text in texts), "blocks": len(blocks), "asset_files": asset_files}
+    return corpus, results
+
+def compare(baseline_path, results_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(results_path, encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline.get("corpus") != current.get("corpus"):
+        print("warning: runs used different corpora; ratios may not be meaningful")
+    regressions = []
+    for name, seconds in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if not before:
+            continue
+        ratio = seconds / before
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:>22}: {before * 1000:9.2f} ms -> {seconds * 1000:9.2f} ms  ({ratio:5.2f}x){flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each build stage on a synthetic corpus.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--inline-density", type=float, default=0.15)
+    parser.add_argument("--list-ratio", type=float, default=0.15)
+    parser.add_argument("--code-ratio", type=float, default=0.1)
+    parser.add_argument("--image-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--asset-files", type=int, default=20)
+    parser.add_argument("--output", default="bench_output.json", help="where to write JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare the results against an earlier JSON run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        corpus, stages = run_stages(
+            root, args.pages, args.repeat, args.asset_files, args.seed, paragraphs=args.paragraphs, inline_density=args.inline_density,
+            list_ratio=args.list_ratio, code_ratio=args.code_ratio, image_ratio=args.image_ratio,
+        )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"python": platform.python_version(), "corpus": corpus, "stages": stages}, f, indent=1)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        regressions = compare(args.compare, args.output, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} stage(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
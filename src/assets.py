@@ -0,0 +1,179 @@
+import os
+import shutil
+from buildreport import log
+from manifest import hash_file, file_record, manifest_path, load_manifest, save_manifest, remove_output
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PUBLISH_MODES = ("copy", "hardlink", "reflink", "copyrange", "symlink")
+# ioctl request number for FICLONE (clone a whole file) on Linux.
+FICLONE = 0x40049409
+FINGERPRINT_LENGTH = 8
+# Stylesheets, scripts, images and fonts that pages refer to. Everything else keeps its
+# name, since docs/ is served as-is: CNAME, robots.txt, favicon.ico and the like.
+FINGERPRINT_TYPES = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".woff", ".woff2", ".ttf", ".otf")
+
+def walk_files(source):
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for file in sorted(files):
+            source_file = os.path.join(root, file)
+            yield os.path.relpath(source_file, source), source_file
+
+def is_fingerprinted(rel_path):
+    if any(part.startswith(".") for part in rel_path.split(os.sep)):
+        return False
+    return rel_path.lower().endswith(FINGERPRINT_TYPES)
+
+def fingerprint_name(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+def is_current(previous, source_file, target_file, source_stat, mode, use_hash=False):
+    # Judged against what the last sync recorded, not the target's own stat: a hardlink
+    # shares the source's inode and a symlink stats as the source, so either would
+    # always look up to date.
+    if previous is None or previous.get("mode") != mode:
+        return False
+    try:
+        target_stat = os.lstat(target_file)
+    except FileNotFoundError:
+        return False
+    linked = mode in ("hardlink", "symlink") and not previous.get("fallback")
+    if os.path.islink(target_file) != (linked and mode == "symlink"):
+        return False
+    if linked and mode == "hardlink":
+        if (target_stat.st_ino, target_stat.st_dev) != (previous.get("ino"), previous.get("dev")):
+            return False
+    elif not linked and target_stat.st_size != source_stat.st_size:
+        return False
+    if previous.get("size") == source_stat.st_size and previous.get("mtime_ns") == source_stat.st_mtime_ns:
+        return True
+    # Same bytes, different mtime. Only a private copy can be compared with its source;
+    # a link always holds the source's current bytes.
+    return use_hash and not linked and target_stat.st_size == source_stat.st_size and hash_file(source_file) == hash_file(target_file)
+
+def reflink_file(source_file, target_file):
+    if fcntl is None:
+        raise OSError("reflinks need fcntl")
+    with open(source_file, "rb") as src, open(target_file, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source_file, target_file)
+
+def copy_range_file(source_file, target_file):
+    # copy_file_range lets the kernel (or the filesystem) move the bytes without
+    # a round trip through user space; sendfile is the older fallback.
+    with open(source_file, "rb") as src, open(target_file, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        copy = getattr(os, "copy_file_range", None)
+        while remaining > 0:
+            if copy is not None:
+                sent = copy(src.fileno(), dst.fileno(), remaining)
+            else:
+                sent = os.sendfile(dst.fileno(), src.fileno(), None, remaining)
+            if sent == 0:
+                break
+            remaining -= sent
+    shutil.copystat(source_file, target_file)
+
+def publish_file(source_file, target_file, mode="copy"):
+    # Build the new entry beside the target and rename it over, so links never hit EEXIST
+    # and readers never see a half-written file. Copies go the same way: writing in place
+    # would follow a symlink into the source, or change every hardlink sharing the inode.
+    tmp_path = f"{target_file}.{os.getpid()}.tmp"
+    try:
+        if mode == "copy":
+            shutil.copy2(source_file, tmp_path)
+        elif mode == "hardlink":
+            os.link(source_file, tmp_path)
+        elif mode == "symlink":
+            os.symlink(os.path.abspath(source_file), tmp_path)
+        elif mode == "reflink":
+            reflink_file(source_file, tmp_path)
+        elif mode == "copyrange":
+            copy_range_file(source_file, tmp_path)
+        else:
+            raise ValueError(f"Unknown publish mode: {mode}")
+        os.replace(tmp_path, target_file)
+    finally:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+def sync_assets(source, target, use_hash=False, manifest_file=None, deploy=None, mode="copy", fingerprint=False, exclude=(), origin=None):
+    # With origin, files are published from the copies an earlier sync made there,
+    # so several output directories can share one set of links to the same bytes.
+    manifest_file = manifest_file or manifest_path(target, "assets")
+    old_files = load_manifest(manifest_file).get("files", {})
+
+    files = {}
+    copied = 0
+    publish_mode = mode
+    for rel_path, source_file in walk_files(source):
+        if rel_path in exclude:
+            continue
+        source_stat = os.stat(source_file)
+        previous = old_files.get(rel_path)
+        if fingerprint and is_fingerprinted(rel_path):
+            # Hashes are reused from the last sync while size and mtime are unchanged.
+            hash_record = file_record(source_file, previous)
+            record = {"size": hash_record["size"], "mtime_ns": hash_record["mtime_ns"], "hash": hash_record["hash"]}
+            record["target"] = fingerprint_name(rel_path, record["hash"])
+        else:
+            record = {"size": source_stat.st_size, "mtime_ns": source_stat.st_mtime_ns, "target": rel_path}
+        record["mode"] = mode
+        files[rel_path] = record
+        target_file = os.path.join(target, record["target"])
+        if previous is not None and previous.get("target") == record["target"] and is_current(previous, source_file, target_file, source_stat, mode, use_hash):
+            for key in ("fallback", "ino", "dev"):
+                if key in previous:
+                    record[key] = previous[key]
+            continue
+        existed = os.path.lexists(target_file)
+        os.makedirs(os.path.dirname(target_file), exist_ok=True)
+        try:
+            publish_file(os.path.join(origin, record["target"]) if origin else source_file, target_file, publish_mode)
+        except (OSError, AttributeError) as e:
+            # Cross-device links, filesystems without reflink support and the like:
+            # fall back to a plain copy for this and every remaining file.
+            log.warning(f"Publishing with {publish_mode} failed ({e}); falling back to copy")
+            publish_mode = "copy"
+            publish_file(source_file, target_file, publish_mode)
+        if publish_mode != mode:
+            record["fallback"] = True
+        elif mode == "hardlink":
+            # The inode the link was made to; a target replaced behind our back no longer matches.
+            target_stat = os.lstat(target_file)
+            record["ino"], record["dev"] = target_stat.st_ino, target_stat.st_dev
+        log.debug(f"Published ({publish_mode}): {source_file} -> {target_file}")
+        copied += 1
+        if deploy is not None:
+            deploy.record(target_file, "changed" if existed else "added", record.get("hash") or hash_file(source_file))
+
+    # Only files this sync published before are deleted; generated pages share the target.
+    live_targets = {record["target"] for record in files.values()}
+    removed = 0
+    for rel_path, previous in old_files.items():
+        if previous.get("target", rel_path) not in live_targets:
+            target_file = os.path.join(target, previous.get("target", rel_path))
+            if os.path.exists(target_file):
+                log.debug(f"Removed: {target_file}")
+                remove_output(target_file, target)
+                removed += 1
+                if deploy is not None:
+                    deploy.remove(target_file)
+
+    save_manifest(manifest_file, {"source": source, "files": files})
+    return copied, len(files) - copied, removed
+
+def load_asset_map(target, manifest_file=None):
+    # Site paths of fingerprinted assets, e.g. {"/index.css": "/index.3f9a1c2e.css"}.
+    files = load_manifest(manifest_file or manifest_path(target, "assets")).get("files", {})
+    asset_map = {}
+    for rel_path, record in files.items():
+        published = record.get("target", rel_path)
+        if published != rel_path:
+            asset_map["/" + rel_path.replace(os.sep, "/")] = "/" + published.replace(os.sep, "/")
+    return asset_map
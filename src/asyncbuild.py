@@ -0,0 +1,124 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from buildreport import PageTimer
+from generatepage import render_targets, generate_targets, collect_results, STREAM_THRESHOLD
+from manifest import write_if_changed
+
+def read_text(path):
+    if os.path.getsize(path) >= STREAM_THRESHOLD:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def make_dirs(directories):
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+def render_to_strings(markdown_content, template_path, outputs, parse_cache, assets=None, minify=False, styles=None, search=False):
+    # One string per output, all rendered from a single parse.
+    timer = PageTimer()
+    sinks = [(basepath, io.StringIO()) for basepath, dest_path in outputs]
+    try:
+        stages, info = render_targets(markdown_content, template_path, sinks, parse_cache, timer, assets, minify, styles, search)
+    except Exception as e:
+        return None, None, None, f"{type(e).__name__}: {e}"
+    return [sink.getvalue() for basepath, sink in sinks], stages, info, None
+
+def stream_to_files(from_path, template_path, outputs, parse_cache, assets=None, minify=False, styles=None, search=False):
+    try:
+        stages, written, info = generate_targets(from_path, template_path, outputs, parse_cache, assets, minify, styles, search)
+    except Exception as e:
+        return None, None, None, f"{type(e).__name__}: {e}"
+    return stages, written, info, None
+
+def write_texts(outputs, htmls):
+    return [write_if_changed(dest_path, lambda f: f.write(html)) for (basepath, dest_path), html in zip(outputs, htmls)]
+
+async def run_pipeline(pages, jobs, io_workers, parse_cache, queue_size, assets=None, minify=False, styles=None, search=False):
+    loop = asyncio.get_running_loop()
+    results = [None] * len(pages)
+    render_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    cpu_workers = max(1, jobs)
+
+    # Processes for CPU-bound rendering; with one job a single thread keeps the loop responsive.
+    cpu_pool = ProcessPoolExecutor(jobs) if jobs > 1 else ThreadPoolExecutor(1)
+    with ThreadPoolExecutor(io_workers) as io_pool, cpu_pool:
+        # Every output directory is created once, up front, instead of once per page.
+        directories = sorted({os.path.dirname(dest_path) for from_path, outputs, template_path in pages for basepath, dest_path in outputs})
+        await loop.run_in_executor(io_pool, make_dirs, directories)
+
+        async def reader(index_queue):
+            while True:
+                index = await index_queue.get()
+                if index is None:
+                    return
+                from_path = pages[index][0]
+                timer = PageTimer()
+                try:
+                    text = await loop.run_in_executor(io_pool, read_text, from_path)
+                except Exception as e:
+                    # Undecodable text fails the page like any other error, not the whole pipeline.
+                    results[index] = (None, None, None, f"{type(e).__name__}: {e}")
+                    continue
+                timer.mark("read")
+                await render_queue.put((index, text, timer.stages))
+
+        async def renderer():
+            while True:
+                item = await render_queue.get()
+                if item is None:
+                    return
+                index, text, stages = item
+                from_path, outputs, template_path = pages[index]
+                if text is None:
+                    # Too large to pass around as a string: the page is streamed straight to its files.
+                    results[index] = await loop.run_in_executor(cpu_pool, stream_to_files, from_path, template_path, outputs, parse_cache, assets, minify, styles, search)
+                    continue
+                htmls, render_stages, info, error = await loop.run_in_executor(cpu_pool, render_to_strings, text, template_path, outputs, parse_cache, assets, minify, styles, search)
+                if error is not None:
+                    results[index] = (None, None, None, error)
+                    continue
+                stages.update(render_stages)
+                await write_queue.put((index, htmls, stages, info))
+
+        async def writer():
+            while True:
+                item = await write_queue.get()
+                if item is None:
+                    return
+                index, htmls, stages, info = item
+                timer = PageTimer()
+                try:
+                    written = await loop.run_in_executor(io_pool, write_texts, pages[index][1], htmls)
+                except Exception as e:
+                    results[index] = (None, None, None, f"{type(e).__name__}: {e}")
+                    continue
+                timer.mark("write")
+                stages.update(timer.stages)
+                results[index] = (stages, written, info, None)
+
+        index_queue = asyncio.Queue()
+        for index in range(len(pages)):
+            index_queue.put_nowait(index)
+        readers = [asyncio.create_task(reader(index_queue)) for _ in range(io_workers)]
+        for _ in readers:
+            index_queue.put_nowait(None)
+        renderers = [asyncio.create_task(renderer()) for _ in range(cpu_workers)]
+        writers = [asyncio.create_task(writer()) for _ in range(io_workers)]
+
+        await asyncio.gather(*readers)
+        for _ in renderers:
+            await render_queue.put(None)
+        await asyncio.gather(*renderers)
+        for _ in writers:
+            await write_queue.put(None)
+        await asyncio.gather(*writers)
+    return results
+
+def generate_pages_async(pages, jobs=1, io_workers=8, report=None, parse_cache=None, assets=None, minify=False, styles=None, search=False):
+    queue_size = 2 * (max(1, jobs) + io_workers)
+    results = asyncio.run(run_pipeline(pages, jobs, io_workers, parse_cache, queue_size, assets, minify, styles, search))
+    return collect_results(((from_path, outputs, template_path) + result for (from_path, outputs, template_path), result in zip(pages, results)), report)
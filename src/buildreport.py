@@ -0,0 +1,83 @@
+import json
+import logging
+import logging.handlers
+import sys
+import time
+
+log = logging.getLogger("ssg")
+
+_buffer = None
+
+def configure_logging(verbosity=0):
+    # Records are buffered and written in batches; errors flush immediately.
+    global _buffer
+    level = logging.DEBUG if verbosity > 0 else logging.WARNING if verbosity < 0 else logging.INFO
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    if _buffer is not None:
+        log.removeHandler(_buffer)
+        _buffer.close()
+    _buffer = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=stream)
+    log.addHandler(_buffer)
+    log.setLevel(level)
+    log.propagate = False
+
+def flush_logs():
+    if _buffer is not None:
+        _buffer.flush()
+
+class PageTimer:
+    def __init__(self):
+        self.stages = {}
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        # Charges the time since the previous mark to stage, so spans cost one clock read.
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+
+class BuildReport:
+    def __init__(self):
+        self.pages = {}
+        self.stages = {}
+        self.started = time.perf_counter()
+
+    def add_page(self, path, stages):
+        self.pages[path] = stages
+
+    def add_stage(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def stage_totals(self):
+        totals = dict(self.stages)
+        for stages in self.pages.values():
+            for stage, seconds in stages.items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages.items(), key=lambda item: sum(item[1].values()), reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "stages": self.stage_totals(),
+            "pages": self.pages,
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+    def log_summary(self, count=10):
+        totals = self.stage_totals()
+        log.info(f"Build took {time.perf_counter() - self.started:.3f} s for {len(self.pages)} rendered page(s)")
+        log.info("Time by stage (summed across workers):")
+        for stage, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            log.info(f"  {stage:>8}: {seconds * 1000:9.2f} ms")
+        if self.pages:
+            log.info("Slowest pages:")
+            for path, stages in self.slowest_pages(count):
+                worst = max(stages, key=stages.get)
+                log.info(f"  {sum(stages.values()) * 1000:9.2f} ms  {path}  (mostly {worst})")
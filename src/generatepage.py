@@ -1,31 +1,207 @@
+import itertools
+import json
 import os
-from markdown import markdown_to_html_node, extract_title
+import re
+from concurrent.futures import ProcessPoolExecutor
+from buildreport import log, PageTimer
+from markdown import blocks_to_page, block_to_html_node, block_title
+from markdownblock import iter_blocks
+from template import load_template, find_layout
+from purgecss import node_selectors, template_selectors
+from linkcheck import page_links, block_links
+from searchindex import add_postings, page_url
+from manifest import hash_bytes, file_record, manifest_path, load_manifest, save_manifest, remove_output, write_if_changed
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+# Bump whenever a change to parsing or rendering alters the generated HTML.
+RENDERER_VERSION = "3"
+# Sources at least this large are streamed block by block instead of being read whole.
+STREAM_THRESHOLD = 8 * 1024 * 1024
+# Facts about each page kept in its manifest record; a record missing one is re-rendered.
+PAGE_INFO = ("selectors", "links")
 
-    with open(from_path, "r", encoding="utf-8") as f:
-        markdown_content = f.read()
+# Template markup may be minified, so quoted and unquoted values are both matched.
+URL_ATTR_PATTERN = re.compile(r'\b((?:href|src)="?)(/[^"\s>]*)')
+STYLESHEET_PATTERN = re.compile(r'<link\b[^>]*\bhref="?(/[^"\s>]*)"?[^>]*>')
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
+class BuildError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        lines += [f"  {from_path}: {error}" for from_path, error in failures]
+        super().__init__("\n".join(lines))
 
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+class UrlRewriter:
+    # Maps site-absolute href/src URLs to fingerprinted asset names and then under
+    # the basepath. Node props are rewritten as they are emitted and the template's
+    # markup through literal(), so page text and code blocks are never touched.
+    def __init__(self, basepath="/", assets=None, styles=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.styles = styles
 
-    title = extract_title(markdown_content)
+    def __call__(self, url):
+        if not url.startswith("/"):
+            return url
+        if self.assets:
+            path = url.split("?", 1)[0].split("#", 1)[0]
+            url = self.assets.get(path, path) + url[len(path):]
+        if self.basepath != "/":
+            url = self.basepath + url[1:]
+        return url
 
-    page_content = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
+    def inline_style(self, match):
+        css = self.styles.get(match.group(1))
+        if css is None or "stylesheet" not in match.group(0):
+            return match.group(0)
+        return f"<style>{css}</style>"
 
-    page_content = page_content.replace('href="/', f'href="{basepath}')
-    page_content = page_content.replace("src=\"/", f'src=\"{basepath}')
+    def literal(self, html):
+        if self.styles:
+            html = STYLESHEET_PATTERN.sub(self.inline_style, html)
+        return URL_ATTR_PATTERN.sub(lambda match: match.group(1) + self(match.group(2)), html)
 
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+def url_rewriter(basepath="/", assets=None, styles=None):
+    if basepath == "/" and not assets and not styles:
+        return None
+    return UrlRewriter(basepath, assets, styles)
 
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(page_content)
+class StreamedContent:
+    # Stands in for the page's node tree: each block is converted, written and
+    # dropped before the next one is read.
+    def __init__(self, blocks, search=False):
+        self.blocks = blocks
+        self.selectors = {"div"}
+        self.links = []
+        self.postings = {} if search else None
+        self.position = 0
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+    def write_html(self, sink, minify=False, rewrite=None):
+        sink.write("<div>")
+        for block in self.blocks:
+            node = block_to_html_node(block)
+            self.selectors |= node_selectors(node)
+            self.links.extend(block_links(block, node))
+            if self.postings is not None:
+                self.position = add_postings(self.postings, node, self.position)
+            node.write_html(sink, minify, rewrite)
+        sink.write("</div>")
+
+def parse_page(markdown_content, timer, parse_cache=None):
+    cached = None
+    if parse_cache is not None:
+        cache_key = parse_cache.key(markdown_content)
+        cached = parse_cache.get(cache_key)
+        timer.mark("cache")
+    if cached is not None:
+        return cached
+
+    blocks = list(iter_blocks(markdown_content.split("\n")))
+    timer.mark("blocks")
+
+    title, html_node = blocks_to_page(blocks)
+    timer.mark("inline")
+
+    # Source lines are only known while the blocks are at hand, so links are cached with the tree.
+    links = page_links(blocks, html_node)
+    if parse_cache is not None:
+        parse_cache.put(cache_key, title, html_node, links)
+        timer.mark("cache")
+    return title, html_node, links
+
+def page_info(selectors, template, links):
+    # Tags, classes and ids the page uses, for purging unused CSS selectors, and
+    # the internal links it makes, for the link checker.
+    return {"selectors": sorted(selectors | template_selectors(template)), "links": links}
+
+def write_page(template, title, content, sink, basepath="/", assets=None, minify=False, styles=None):
+    template.write(sink, {"Title": title, "Content": content}, minify, url_rewriter(basepath, assets, styles))
+
+def add_search_info(info, title, html_node, timer):
+    # Word positions for the search index; only computed when the build writes one.
+    postings = {}
+    add_postings(postings, html_node)
+    info["search"] = [title, postings]
+    timer.mark("search")
+
+def render_targets(markdown_content, template_path, sinks, parse_cache=None, timer=None, assets=None, minify=False, styles=None, search=False):
+    # sinks is [(basepath, sink), ...]: the page is parsed once and written under each basepath.
+    timer = timer or PageTimer()
+    template = load_template(template_path)
+    title, html_node, links = parse_page(markdown_content, timer, parse_cache)
+    for basepath, sink in sinks:
+        write_page(template, title, html_node, sink, basepath, assets, minify, styles)
+    info = page_info(node_selectors(html_node), template, links)
+    timer.mark("render")
+    if search:
+        add_search_info(info, title, html_node, timer)
+    return timer.stages, info
+
+def render_page(markdown_content, template_path, sink, basepath="/", parse_cache=None, timer=None, assets=None, minify=False, styles=None, search=False):
+    return render_targets(markdown_content, template_path, [(basepath, sink)], parse_cache, timer, assets, minify, styles, search)
+
+def stream_page(from_path, template_path, sink, basepath="/", timer=None, assets=None, minify=False, styles=None, search=False):
+    timer = timer or PageTimer()
+    template = load_template(template_path)
+    with open(from_path, "r", encoding="utf-8") as f:
+        blocks = iter_blocks(f)
+        # Blocks are only held back until the first h1, because the template needs
+        # the title before any content is written.
+        buffered = []
+        title = None
+        for block in blocks:
+            buffered.append(block)
+            title = block_title(block)
+            if title is not None:
+                break
+        if title is None:
+            raise Exception("No h1 header found in markdown.")
+        content = StreamedContent(itertools.chain(buffered, blocks), search)
+        write_page(template, title, content, sink, basepath, assets, minify, styles)
+    info = page_info(content.selectors, template, content.links)
+    if search:
+        info["search"] = [title, content.postings]
+    timer.mark("stream")
+    return timer.stages, info
+
+def generate_targets(from_path, template_path, outputs, parse_cache=None, assets=None, minify=False, styles=None, search=False):
+    # outputs is [(basepath, dest_path), ...]; returns one write_if_changed result per output.
+    timer = PageTimer()
+    written = []
+    if os.path.getsize(from_path) >= STREAM_THRESHOLD:
+        # Read, parse, render and write are interleaved, so memory is bounded by the
+        # largest block; the parse cache is skipped as it would hold the whole tree.
+        # Keeping the tree for a second target would defeat that, so each target
+        # streams the source again.
+        rendered = []
+        # Only the first target's pass collects postings; the others would repeat them.
+        for basepath, dest_path in outputs:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            written.append(write_if_changed(dest_path, lambda f: rendered.append(stream_page(from_path, template_path, f, basepath, timer, assets, minify, styles, search and not rendered))))
+        stages, info = rendered[0]
+        return stages, written, info
+
+    with open(from_path, "r", encoding="utf-8") as f:
+        markdown_content = f.read()
+    timer.mark("read")
+    template = load_template(template_path)
+    title, html_node, links = parse_page(markdown_content, timer, parse_cache)
+    for basepath, dest_path in outputs:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        # Template fill, URL rewriting, serialization and the write all stream
+        # into the file, so they are timed together as "render".
+        written.append(write_if_changed(dest_path, lambda f: write_page(template, title, html_node, f, basepath, assets, minify, styles)))
+    info = page_info(node_selectors(html_node), template, links)
+    timer.mark("render")
+    if search:
+        add_search_info(info, title, html_node, timer)
+    return timer.stages, written, info
+
+def generate_page(from_path, template_path, dest_path, basepath="/", parse_cache=None, assets=None, minify=False, styles=None, search=False):
+    stages, written, info = generate_targets(from_path, template_path, [(basepath, dest_path)], parse_cache, assets, minify, styles, search)
+    return stages, written[0], info
+
+def find_pages(dir_path_content, dest_dir_path):
+    pages = []
     for root, dirs, files in os.walk(dir_path_content):
         for file in files:
             if file.endswith('.md'):
@@ -35,4 +211,211 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 dest_file = os.path.splitext(file)[0] + '.html'
                 dest_path = os.path.join(dest_dir, dest_file)
                 from_path = os.path.join(root, file)
-                generate_page(from_path, template_path, dest_path, basepath)
+                pages.append((from_path, dest_path))
+    return sorted(pages)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+    for from_path, dest_path in find_pages(dir_path_content, dest_dir_path):
+        log.debug(f"Generating page from {from_path} to {dest_path}")
+        generate_page(from_path, find_layout(from_path, dir_path_content, template_path), dest_path, basepath)
+
+def generate_chunk(chunk, parse_cache=None, assets=None, minify=False, styles=None, search=False):
+    results = []
+    for from_path, outputs, template_path in chunk:
+        stages = written = info = error = None
+        try:
+            stages, written, info = generate_targets(from_path, template_path, outputs, parse_cache, assets, minify, styles, search)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append((from_path, outputs, template_path, stages, written, info, error))
+    return results
+
+def chunk_pages(pages, jobs):
+    # A few chunks per worker keeps the pool balanced without one IPC round trip per page.
+    size = max(1, len(pages) // (jobs * 4))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+def collect_results(results, report=None):
+    # Results come back in submission order, so the log is the same for any --jobs.
+    failures = []
+    info = {}
+    written = {}
+    for from_path, outputs, template_path, stages, page_written, fields, error in results:
+        if error is not None:
+            failures.append((from_path, error))
+            continue
+        info[from_path] = fields
+        for (basepath, dest_path), output in zip(outputs, page_written):
+            log.debug(f"Generated page from {from_path} to {dest_path} using {template_path} ({output[0]})")
+            written[dest_path] = output
+        if report is not None:
+            report.add_page(from_path, stages)
+    return failures, info, written
+
+def generate_pages(pages, jobs=1, report=None, parse_cache=None, assets=None, minify=False, styles=None, search=False):
+    if jobs > 1 and len(pages) > 1:
+        chunks = chunk_pages(pages, jobs)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+            chunk_results = list(pool.map(generate_chunk, chunks, [parse_cache] * len(chunks), [assets] * len(chunks), [minify] * len(chunks), [styles] * len(chunks), [search] * len(chunks)))
+    else:
+        chunk_results = [generate_chunk(pages, parse_cache, assets, minify, styles, search)]
+    return collect_results(itertools.chain.from_iterable(chunk_results), report)
+
+def build_key(basepath, minify=False, styles=None):
+    # Inlined CSS ends up in every page, so a change to it rebuilds them all. Fingerprinted
+    # names are tracked per page instead (see asset_refs), as most pages use few assets.
+    style_key = json.dumps(styles, sort_keys=True) if styles else ""
+    minify_key = "\0minify" if minify else ""
+    return hash_bytes(f"{RENDERER_VERSION}\0{basepath}\0{style_key}{minify_key}".encode("utf-8"))
+
+def template_urls(template):
+    # Site-absolute URLs in the template's own markup, computed once per compiled template.
+    if template.urls is None:
+        template.urls = [match.group(2) for segment in template.segments if isinstance(segment, str) for match in URL_ATTR_PATTERN.finditer(segment)]
+    return template.urls
+
+def asset_refs(links, template, assets):
+    # The fingerprinted names a page's output contains, {site path: published path}, from
+    # the links recorded for it and its template's markup. A page is only rendered again
+    # when one of these is renamed.
+    refs = {}
+    if assets:
+        for url in [url for url, line in links] + template_urls(template):
+            path = url.split("?", 1)[0].split("#", 1)[0]
+            if path in assets:
+                refs[path] = assets[path]
+    return refs
+
+class Target:
+    # One place the site is published to: pages rendered under basepath into
+    # dest_dir, each with its own manifest and deploy list.
+    def __init__(self, basepath, dest_dir, manifest_file=None, deploy=None):
+        self.basepath = basepath
+        self.dest_dir = dest_dir
+        self.manifest_file = manifest_file or manifest_path(dest_dir)
+        self.deploy = deploy
+
+def plan_target(dir_path_content, template_path, target, key, assets=None):
+    old_manifest = load_manifest(target.manifest_file)
+    old_pages = old_manifest.get("pages", {})
+    key_changed = old_manifest.get("build_key") != key
+
+    pages = {}
+    pending = []
+    for from_path, dest_path in find_pages(dir_path_content, target.dest_dir):
+        rel_path = os.path.relpath(from_path, dir_path_content)
+        previous = old_pages.get(rel_path)
+        layout = find_layout(from_path, dir_path_content, template_path)
+        record = file_record(from_path, previous)
+        for field in PAGE_INFO:
+            if previous and field in previous:
+                record.setdefault(field, previous[field])
+        record["dest"] = dest_path
+        template = load_template(layout)
+        record["template"] = template.fingerprint
+        record.pop("assets", None)
+        refs = asset_refs(record.get("links", ()), template, assets)
+        if refs:
+            record["assets"] = refs
+        pages[rel_path] = record
+        if (
+            key_changed
+            or previous is None
+            or previous.get("hash") != record["hash"]
+            or previous.get("template") != record["template"]
+            or previous.get("assets", {}) != refs
+            or previous.get("dest") != dest_path
+            or any(field not in record for field in PAGE_INFO)
+            or not os.path.exists(dest_path)
+        ):
+            pending.append((from_path, dest_path, layout))
+    return old_pages, pages, pending
+
+def finish_target(dir_path_content, target, key, old_pages, pages, pending, info, written, failed, assets=None):
+    for from_path, fields in info.items():
+        rel_path = os.path.relpath(from_path, dir_path_content)
+        if rel_path in pages:
+            pages[rel_path].update(fields)
+    if assets:
+        # Rendering may have changed a page's links, and with them the assets it refers to.
+        for from_path, dest_path, layout in pending:
+            record = pages.get(os.path.relpath(from_path, dir_path_content))
+            if record is not None:
+                record.pop("assets", None)
+                refs = asset_refs(record.get("links", ()), load_template(layout), assets)
+                if refs:
+                    record["assets"] = refs
+    if target.deploy is not None:
+        for from_path, dest_path, layout in pending:
+            if dest_path in written:
+                target.deploy.record(dest_path, *written[dest_path])
+    # Failed pages stay out of the manifest so the next build retries them.
+    for from_path in failed:
+        pages.pop(os.path.relpath(from_path, dir_path_content), None)
+    generated = sum(1 for from_path, dest_path, layout in pending if from_path not in failed)
+
+    live_dests = {record["dest"] for record in pages.values()}
+    live_dests.update(dest_path for from_path, dest_path, layout in pending)
+    removed = 0
+    for rel_path, previous in old_pages.items():
+        dest_path = previous.get("dest")
+        if dest_path and dest_path not in live_dests and os.path.exists(dest_path):
+            log.debug(f"Removing stale page {dest_path}")
+            remove_output(dest_path, target.dest_dir)
+            if target.deploy is not None:
+                target.deploy.remove(dest_path)
+            removed += 1
+
+    save_manifest(target.manifest_file, {"build_key": key, "renderer_version": RENDERER_VERSION, "basepath": target.basepath, "pages": pages})
+    return generated, len(pages) - generated, removed
+
+def generate_targets_incremental(dir_path_content, template_path, targets, jobs=1, report=None, parse_cache=None, io_workers=0, assets=None, minify=False, styles=None, search_index=None):
+    keys = [build_key(target.basepath, minify, styles) for target in targets]
+    plans = [plan_target(dir_path_content, template_path, target, key, assets) for target, key in zip(targets, keys)]
+
+    # A page pending in several targets is read and parsed once and written to each of them.
+    outputs = {}
+    layouts = {}
+    for target, (old_pages, pages, pending) in zip(targets, plans):
+        for from_path, dest_path, layout in pending:
+            outputs.setdefault(from_path, []).append((target.basepath, dest_path))
+            layouts[from_path] = layout
+    if search_index is not None:
+        # Pages the search index has not seen yet are rendered once more for the first
+        # target; their output is unchanged, so nothing is rewritten or redeployed.
+        for rel_path, record in plans[0][1].items():
+            from_path = os.path.join(dir_path_content, rel_path)
+            if search_index.needs(rel_path, record["hash"]) and from_path not in outputs:
+                outputs[from_path] = [(targets[0].basepath, record["dest"])]
+                layouts[from_path] = find_layout(from_path, dir_path_content, template_path)
+    work = [(from_path, tuple(outputs[from_path]), layouts[from_path]) for from_path in sorted(outputs)]
+
+    search = search_index is not None
+    if io_workers > 0:
+        # Imported here because asyncbuild builds on this module's render helpers.
+        from asyncbuild import generate_pages_async
+        failures, info, written = generate_pages_async(work, jobs, io_workers, report, parse_cache, assets, minify, styles, search)
+    else:
+        failures, info, written = generate_pages(work, jobs, report, parse_cache, assets, minify, styles, search)
+    if search:
+        # Postings go to the search index, not the page manifest.
+        for from_path, fields in info.items():
+            title, postings = fields.pop("search")
+            rel_path = os.path.relpath(from_path, dir_path_content)
+            record = plans[0][1][rel_path]
+            search_index.update(rel_path, page_url(record["dest"], targets[0].dest_dir), title, postings, record["hash"])
+
+    failed = {from_path for from_path, error in failures}
+    counts = [
+        finish_target(dir_path_content, target, key, *plan, info, written, failed, assets)
+        for target, key, plan in zip(targets, keys, plans)
+    ]
+    if search:
+        search_index.write(plans[0][1], [(target.dest_dir, target.deploy) for target in targets])
+    if failures:
+        raise BuildError(failures)
+    return counts
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath="/", manifest_file=None, jobs=1, report=None, parse_cache=None, io_workers=0, deploy=None, assets=None, minify=False, styles=None, search_index=None):
+    target = Target(basepath, dest_dir_path, manifest_file, deploy)
+    return generate_targets_incremental(dir_path_content, template_path, [target], jobs, report, parse_cache, io_workers, assets, minify, styles, search_index)[0]
@@ -1,6 +1,17 @@
+import sys
+from minify import attribute, collapse_whitespace, PRESERVE_TAGS
+
+URL_PROPS = ("href", "src")
+
+def intern_tag(tag):
+    # Tags repeat on every node, so all nodes share one string object per tag name.
+    return sys.intern(tag) if type(tag) is str else tag
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = intern_tag(tag)
         self.value = value
         self.children = children if children is not None else None
         self.props = props if props is not None else None
@@ -8,15 +19,31 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("to_html() must be implemented by subclasses.")
 
-    def props_to_html(self):
+    def iter_html(self, minify=False, rewrite=None):
+        yield self.to_html()
+
+    def write_html(self, sink, minify=False, rewrite=None):
+        write = sink.write
+        for fragment in self.iter_html(minify, rewrite):
+            write(fragment)
+
+    def props_to_html(self, minify=False, rewrite=None):
         if not self.props:
             return ""
-        return ''.join(f' {key}="{value}"' for key, value in self.props.items())
+        items = self.props.items()
+        if rewrite is not None:
+            # URLs are rewritten as they are emitted, so the tree itself stays independent of basepath.
+            items = [(key, rewrite(value) if key in URL_PROPS else value) for key, value in items]
+        if minify:
+            return ''.join(attribute(key, value) for key, value in items)
+        return ''.join(f' {key}="{value}"' for key, value in items)
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag!r}, value={self.value!r}, children={self.children!r}, props={self.props!r})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value.")
@@ -29,7 +56,24 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self, minify=False, rewrite=None):
+        if not minify and rewrite is None:
+            yield self.to_html()
+            return
+        if self.value is None:
+            raise ValueError("LeafNode must have a value.")
+        value = self.value
+        # Inline code keeps its spacing exactly, like <pre> blocks.
+        if minify and self.tag != "code" and self.tag not in PRESERVE_TAGS:
+            value = collapse_whitespace(value)
+        if self.tag is None:
+            yield value
+        else:
+            yield f"<{self.tag}{self.props_to_html(minify, rewrite)}>{value}</{self.tag}>"
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if tag is None:
             raise ValueError("ParentNode must have a tag.")
@@ -43,4 +87,26 @@ class ParentNode(HTMLNode):
         if self.children is None:
             raise ValueError("ParentNode must have children.")
         children_html = ''.join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+
+    def iter_html(self, minify=False, rewrite=None):
+        # Explicit stack instead of recursion: each subtree's markup is yielded
+        # once instead of being copied into every ancestor's string.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                if minify and node.tag in PRESERVE_TAGS:
+                    yield from node.iter_html(False, rewrite)
+                    continue
+                if node.tag is None:
+                    raise ValueError("ParentNode must have a tag.")
+                if node.children is None:
+                    raise ValueError("ParentNode must have children.")
+                yield f"<{node.tag}{node.props_to_html(minify, rewrite)}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield from node.iter_html(minify, rewrite)
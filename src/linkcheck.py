@@ -0,0 +1,99 @@
+import os
+import posixpath
+from urllib.parse import unquote
+from assets import walk_files
+from htmlnode import ParentNode, URL_PROPS
+from manifest import load_manifest, manifest_path
+from markdownblock import BlockType
+
+def is_checked(url):
+    # External URLs (any scheme, or protocol-relative) and bare fragments are not checked.
+    return bool(url) and not url.startswith(("#", "//")) and ":" not in url.split("/", 1)[0]
+
+def node_links(node, links):
+    # Appends the node's descendants' href/src values in document order.
+    for child in node.children:
+        if child.props:
+            for prop in URL_PROPS:
+                url = child.props.get(prop)
+                if url is not None and is_checked(url):
+                    links.append(url)
+        if isinstance(child, ParentNode):
+            node_links(child, links)
+    return links
+
+def block_links(block, node):
+    # [url, line] pairs for the links in one block.
+    if block.type == BlockType.code or not any("](" in line for line in block.lines):
+        # Most blocks have no link or image syntax and their nodes are never walked.
+        return []
+    urls = node_links(node, [])
+    if len(block.lines) == 1:
+        return [[url, block.start] for url in urls]
+    # Links come out in source order, so the line search resumes where the previous one was found.
+    links = []
+    index = 0
+    for url in urls:
+        for i in range(index, len(block.lines)):
+            if url in block.lines[i]:
+                index = i
+                break
+        links.append([url, block.start + index])
+    return links
+
+def page_links(blocks, html_node):
+    # The page's top-level children are built one per block, in order.
+    links = []
+    for block, node in zip(blocks, html_node.children):
+        links.extend(block_links(block, node))
+    return links
+
+def site_index(dest_dir, assets=None):
+    # Every URL the published site answers: files as-is, pages also without
+    # ".html" and directory indexes with and without the trailing slash.
+    # Fingerprinted assets are also known by the names pages refer to them with.
+    index = set(assets or ())
+    for rel_path, path in walk_files(dest_dir):
+        url = "/" + rel_path.replace(os.sep, "/")
+        index.add(url)
+        if url.endswith("/index.html"):
+            index.add(url[:-len("index.html")])
+            if url != "/index.html":
+                index.add(url[:-len("/index.html")])
+        elif url.endswith(".html"):
+            index.add(url[:-len(".html")])
+    return index
+
+def resolve(url, page_url):
+    path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+    if not path:
+        return None
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page_url), path)
+    resolved = posixpath.normpath(path)
+    if path.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+def find_broken_links(pages, index):
+    # pages is [(source, page_url, links)]; one set lookup per link.
+    broken = []
+    for source, page_url, links in pages:
+        for url, line in links:
+            target = resolve(url, page_url)
+            if target is not None and target not in index:
+                broken.append((source, line, url))
+    return broken
+
+def check_links(dir_path_content, dest_dir, manifest_file=None, assets=None):
+    # Links are read from the page manifest, so unchanged pages are checked
+    # without being parsed again.
+    pages = load_manifest(manifest_file or manifest_path(dest_dir)).get("pages", {})
+    entries = []
+    checked = 0
+    for rel_path, record in sorted(pages.items()):
+        page_url = "/" + os.path.relpath(record["dest"], dest_dir).replace(os.sep, "/")
+        links = record.get("links", ())
+        checked += len(links)
+        entries.append((os.path.join(dir_path_content, rel_path), page_url, links))
+    return checked, find_broken_links(entries, site_index(dest_dir, assets))
@@ -1,31 +1,165 @@
+import argparse
 import os
-import shutil
 import sys
-from generatepage import generate_pages_recursive
-
-def copy_recursive(source, target):
-    if os.path.exists(target):
-        shutil.rmtree(target)
-    os.makedirs(target, exist_ok=True)
-    for root, dirs, files in os.walk(source):
-        rel_path = os.path.relpath(root, source)
-        dest_dir = os.path.join(target, rel_path) if rel_path != '.' else target
-        os.makedirs(dest_dir, exist_ok=True)
-        for file in files:
-            source_file = os.path.join(root, file)
-            target_file = os.path.join(dest_dir, file)
-            shutil.copy2(source_file, target_file)
-            print(f"Copied: {source_file} -> {target_file}")
+import time
+from assets import sync_assets, load_asset_map, PUBLISH_MODES
+from buildreport import log, configure_logging, flush_logs, BuildReport
+from generatepage import generate_targets_incremental, Target, BuildError
+from linkcheck import check_links
+from manifest import DeployManifest, manifest_path
+from parsecache import ParseCache
+from precompress import precompress, drop_stale
+from searchindex import SearchIndex
+from purgecss import find_stylesheets, purge_stylesheets, write_stylesheets, site_selectors, inline_styles
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    parser.add_argument("targets", nargs="*", metavar="BASEPATH[:OUTDIR]", help="basepath to render under and the directory to write to (default: / into docs); repeat to publish several targets from one parse")
+    parser.add_argument("--hash-assets", action="store_true", help="compare static files by content when size matches but mtime differs")
+    parser.add_argument("--assets-mode", choices=PUBLISH_MODES, default="copy", help="how static files are published into docs/ (falls back to copy when unsupported)")
+    parser.add_argument("--fingerprint-assets", action="store_true", help="publish static files under content-hashed names and rewrite page references to them")
+    parser.add_argument("--purge-css", action="store_true", help="drop selectors from static stylesheets that no generated page can match")
+    parser.add_argument("--inline-css", action="store_true", help="purge stylesheets and inline them into each page's head when they are small")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render pages across N worker processes (0 = one per CPU)")
+    parser.add_argument("--io-workers", type=int, default=0, help="overlap reads and writes with rendering using N I/O threads (asyncio pipeline)")
+    parser.add_argument("--parse-cache-mb", type=int, default=0, help="size limit of the on-disk parse cache (0, the default, disables it)")
+    parser.add_argument("--minify", action="store_true", help="strip comments, indentation and optional quotes from generated pages (code blocks are kept as-is)")
+    parser.add_argument("--search-index", action="store_true", help="write a sharded inverted index of page text to search/ for client-side search")
+    parser.add_argument("--check-links", action="store_true", help="warn about links and images that point at pages or files the site does not have")
+    parser.add_argument("--gzip", action="store_true", help="write .gz siblings of HTML, CSS, SVG and JS outputs for the static server")
+    parser.add_argument("--deploy-manifest", metavar="PATH", help="where to write the added/changed/removed output list (default: .ssg-cache/deploy-docs.json)")
+    parser.add_argument("--report", metavar="PATH", help="write per-page, per-stage timings as JSON and log a summary")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="log every generated page and copied file")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+    return parser
+
+def parse_target(value):
+    basepath, sep, outdir = value.partition(":")
+    return basepath or "/", outdir or "docs"
+
+def parse_args(argv=None, parser=None):
+    parser = parser or build_parser()
+    args = parser.parse_args(argv)
+    args.targets = [parse_target(value) for value in args.targets] or [("/", "docs")]
+    outdirs = [os.path.normpath(outdir) for basepath, outdir in args.targets]
+    if len(set(outdirs)) != len(outdirs):
+        parser.error("each target needs its own output directory")
+    if args.deploy_manifest and len(args.targets) > 1:
+        parser.error("--deploy-manifest needs a single target; each target gets .ssg-cache/deploy-<outdir>.json")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or positive")
+    if args.inline_css:
+        args.purge_css = True
+    if args.purge_css and args.fingerprint_assets:
+        # A fingerprint is taken from the source file, but purged output also depends on the pages.
+        parser.error("--purge-css and --inline-css cannot be combined with --fingerprint-assets")
+    configure_logging(-1 if args.quiet else args.verbose)
+    return args
+
+def target_label(args, outdir):
+    return f" ({outdir})" if len(args.targets) > 1 else ""
+
+def build_pages(args, report, deploys, styles=None):
+    # Read back from the asset manifest so page-only rebuilds see the current names.
+    asset_map = load_asset_map(args.targets[0][1]) if args.fingerprint_assets else None
+    parse_cache = ParseCache(max_bytes=args.parse_cache_mb * 1024 * 1024) if args.parse_cache_mb > 0 else None
+    targets = [Target(basepath, outdir, deploy=deploy) for (basepath, outdir), deploy in zip(args.targets, deploys)]
+    search_index = SearchIndex(args.targets[0][1]) if args.search_index else None
+    counts = generate_targets_incremental(
+        "content", "template.html", targets, jobs=args.jobs, report=report, parse_cache=parse_cache, io_workers=args.io_workers, assets=asset_map, minify=args.minify, styles=styles, search_index=search_index,
+    )
+    for (basepath, outdir), (generated, skipped, removed) in zip(args.targets, counts):
+        log.info(f"Pages{target_label(args, outdir)}: {generated} generated, {skipped} unchanged, {removed} removed")
+    if search_index is not None:
+        log.info(f"Search: {len(search_index.pages)} pages indexed, {search_index.written} shard(s) rewritten")
+    if parse_cache is not None:
+        parse_cache.evict()
 
-    if os.path.exists("docs"):
-        shutil.rmtree("docs")
+def build(args, assets=True, pages=True):
+    report = BuildReport() if args.report else None
+    outdirs = [outdir for basepath, outdir in args.targets]
+    primary = outdirs[0]
+    deploys = [DeployManifest(outdir) for outdir in outdirs]
+    # Purged stylesheets are written by the CSS stage, not copied with the other assets.
+    stylesheets = find_stylesheets("static") if args.purge_css else []
+    try:
+        # Pages are rebuilt incrementally from the manifest, so docs/ is no longer wiped.
+        if assets:
+            start = time.perf_counter()
+            for outdir, deploy in zip(outdirs, deploys):
+                if outdir == primary:
+                    copied, unchanged, removed = sync_assets("static", outdir, use_hash=args.hash_assets, deploy=deploy, mode=args.assets_mode, fingerprint=args.fingerprint_assets, exclude=stylesheets)
+                else:
+                    # Further targets link to the primary target's copies instead of copying again.
+                    shared_mode = "symlink" if args.assets_mode == "symlink" else "hardlink"
+                    copied, unchanged, removed = sync_assets("static", outdir, use_hash=args.hash_assets, deploy=deploy, mode=shared_mode, fingerprint=args.fingerprint_assets, exclude=stylesheets, origin=primary)
+                log.info(f"Assets{target_label(args, outdir)}: {copied} copied, {unchanged} unchanged, {removed} removed")
+            if report is not None:
+                report.add_stage("assets", time.perf_counter() - start)
 
-    copy_recursive("static", "docs")
+        # Every target renders the same pages, so the primary target's selectors stand for all of them.
+        styles = None
+        if args.inline_css:
+            # Inlined from the selectors the last build recorded; if this build changes them,
+            # the CSS stage below renders the pages once more.
+            styles = inline_styles(purge_stylesheets("static", stylesheets, site_selectors(manifest_path(primary))))
+        if pages:
+            build_pages(args, report, deploys, styles)
 
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+        if args.purge_css:
+            start = time.perf_counter()
+            purged = purge_stylesheets("static", stylesheets, site_selectors(manifest_path(primary)))
+            for outdir, deploy in zip(outdirs, deploys):
+                write_stylesheets(outdir, purged, deploy)
+            if report is not None:
+                report.add_stage("css", time.perf_counter() - start)
+            original = sum(os.path.getsize(os.path.join("static", rel_path)) for rel_path in stylesheets)
+            log.info(f"CSS: {len(purged)} stylesheet(s) purged from {original} to {sum(len(css.encode('utf-8')) for css in purged.values())} bytes")
+            if args.inline_css and inline_styles(purged) != styles:
+                build_pages(args, report, deploys, inline_styles(purged))
+
+        if args.check_links:
+            start = time.perf_counter()
+            # Links are stored before basepath rewriting, so checking one target covers them all.
+            asset_map = load_asset_map(primary) if args.fingerprint_assets else None
+            checked, broken = check_links("content", primary, assets=asset_map)
+            for source, line, url in broken:
+                log.warning(f"{source}:{line}: broken link {url}")
+            if report is not None:
+                report.add_stage("links", time.perf_counter() - start)
+            log.info(f"Links: {checked} checked, {len(broken)} broken")
+
+        if args.gzip:
+            start = time.perf_counter()
+            for outdir, deploy in zip(outdirs, deploys):
+                compressed, unchanged, skipped, saved, total = precompress(outdir, deploy=deploy)
+                percent = 100 * saved / total if total else 0
+                log.info(f"Gzip{target_label(args, outdir)}: {compressed} compressed, {unchanged} unchanged, {skipped} skipped; saved {saved / 1024:.1f} KiB of {total / 1024:.1f} KiB ({percent:.0f}%)")
+            if report is not None:
+                report.add_stage("gzip", time.perf_counter() - start)
+        else:
+            for outdir, deploy in zip(outdirs, deploys):
+                dropped = drop_stale(outdir, deploy)
+                if dropped:
+                    log.info(f"Gzip{target_label(args, outdir)}: {dropped} stale sibling(s) removed")
+    finally:
+        for outdir, deploy in zip(outdirs, deploys):
+            deploy.write(args.deploy_manifest or manifest_path(outdir, "deploy"))
+            log.info(f"Deploy{target_label(args, outdir)}: {len(deploy.added)} added, {len(deploy.changed)} changed, {len(deploy.removed)} removed")
+        if report is not None:
+            report.write(args.report)
+            report.log_summary()
+        flush_logs()
+
+def main():
+    args = parse_args()
+    try:
+        build(args)
+    except BuildError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
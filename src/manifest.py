@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+CACHE_DIR = ".ssg-cache"
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_record(path, previous=None):
+    # Only rehash when size or mtime moved, so unchanged sources cost a stat().
+    st = os.stat(path)
+    if previous and previous.get("hash") and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        return dict(previous)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": hash_file(path)}
+
+class HashingWriter:
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        self.hash.update(data)
+        self.size += len(data)
+        self.f.write(data)
+
+def write_if_changed(dest_path, write):
+    # Render into a temporary file while hashing it; the existing output is only
+    # replaced when the bytes differ, so unchanged outputs keep their mtime.
+    tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            sink = HashingWriter(f)
+            write(sink)
+        digest = sink.hash.hexdigest()
+        try:
+            existing_size = os.stat(dest_path).st_size
+        except FileNotFoundError:
+            existing_size = None
+        if existing_size == sink.size and hash_file(dest_path) == digest:
+            return "unchanged", digest
+        os.replace(tmp_path, dest_path)
+        return ("added" if existing_size is None else "changed"), digest
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class DeployManifest:
+    def __init__(self, root):
+        self.root = root
+        self.added = {}
+        self.changed = {}
+        self.removed = []
+
+    def record(self, path, status, digest):
+        rel_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+        if status == "added":
+            self.added[rel_path] = digest
+        elif status == "changed":
+            # A file written twice in one build is still new to the deploy target.
+            if rel_path in self.added:
+                self.added[rel_path] = digest
+            else:
+                self.changed[rel_path] = digest
+
+    def remove(self, path):
+        self.removed.append(os.path.relpath(path, self.root).replace(os.sep, "/"))
+
+    def write(self, path):
+        save_manifest(path, {"root": self.root, "added": self.added, "changed": self.changed, "removed": sorted(self.removed)})
+
+def manifest_path(dest_dir, name="manifest"):
+    slug = os.path.normpath(dest_dir).strip(os.sep).replace(os.sep, "_") or "root"
+    return os.path.join(CACHE_DIR, f"{name}-{slug}.json")
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def remove_output(path, stop_dir):
+    if os.path.exists(path):
+        os.remove(path)
+    directory = os.path.dirname(path)
+    stop_dir = os.path.normpath(stop_dir)
+    while directory and os.path.normpath(directory) != stop_dir:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
@@ -1,5 +1,5 @@
 import re
-from markdownblock import markdown_to_blocks, block_to_block_type, BlockType
+from markdownblock import iter_blocks, BlockType, HEADING_PATTERN
 from textnode import text_node_to_html_node
 from htmlnode import ParentNode, LeafNode
 from splitnode import text_to_textnodes
@@ -8,42 +8,49 @@ def text_to_children(text):
     return [text_node_to_html_node(node) for node in text_to_textnodes(text)]
 
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+    return blocks_to_html_node(iter_blocks(markdown.split("\n")))
+
+def blocks_to_html_node(blocks):
+    return ParentNode("div", [block_to_html_node(block) for block in blocks])
+
+def block_title(block):
+    # The text of an h1 heading block, used as the page title; None for any other block.
+    if block.type == BlockType.heading and block.lines[0].startswith("# "):
+        return block.lines[0][2:].strip()
+    return None
+
+def blocks_to_page(blocks):
+    # Builds the tree and picks up the title from the first h1 in the same pass.
+    title = None
     children = []
     for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.heading:
-            import re
-            m = re.match(r"^(#{1,6}) ", block)
-            level = len(m.group(1)) if m else 1
-            tag = f"h{level}"
-            text = block[level+1:] if m else block
-            node = ParentNode(tag, text_to_children(text))
-        elif block_type == BlockType.code:
-            lines = block.split("\n")
-            if lines[0].startswith("```") and lines[-1].startswith("```") and len(lines) >= 2:
-                code_lines = lines[1:-1]
-            else:
-                code_lines = lines
-            code_text = "\n".join(code_lines) + "\n"
-            code_node = LeafNode("code", code_text)
-            node = ParentNode("pre", [code_node])
-        elif block_type == BlockType.quote:
-            quote_text = "\n".join([line[2:] if line.startswith("> ") else line[1:] for line in block.split("\n")])
-            node = ParentNode("blockquote", text_to_children(quote_text))
-        elif block_type == BlockType.unordered_list:
-            items = [line[2:] for line in block.split("\n")]
-            li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
-            node = ParentNode("ul", li_nodes)
-        elif block_type == BlockType.ordered_list:
-            items = [line[line.find(". ")+2:] for line in block.split("\n")]
-            li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
-            node = ParentNode("ol", li_nodes)
+        if title is None:
+            title = block_title(block)
+        children.append(block_to_html_node(block))
+    if title is None:
+        raise Exception("No h1 header found in markdown.")
+    return title, ParentNode("div", children)
+
+def block_to_html_node(block):
+    lines = block.lines
+    if block.type == BlockType.heading:
+        m = HEADING_PATTERN.match(lines[0])
+        level = len(m.group(1))
+        return ParentNode(f"h{level}", text_to_children(lines[0][level+1:]))
+    if block.type == BlockType.code:
+        if len(lines) >= 2:
+            code_lines = lines[1:-1]
         else:
-            para_text = " ".join(block.split("\n"))
-            node = ParentNode("p", text_to_children(para_text))
-        children.append(node)
-    return ParentNode("div", children)
+            code_lines = lines
+        return ParentNode("pre", [LeafNode("code", "\n".join(code_lines) + "\n")])
+    if block.type == BlockType.quote:
+        quote_text = "\n".join([line[2:] if line.startswith("> ") else line[1:] for line in lines])
+        return ParentNode("blockquote", text_to_children(quote_text))
+    if block.type == BlockType.unordered_list:
+        return ParentNode("ul", [ParentNode("li", text_to_children(line[2:])) for line in lines])
+    if block.type == BlockType.ordered_list:
+        return ParentNode("ol", [ParentNode("li", text_to_children(line[line.find(". ")+2:])) for line in lines])
+    return ParentNode("p", text_to_children(" ".join(lines)))
 
 def extract_title(markdown):
     for line in markdown.splitlines():
@@ -1,34 +1,26 @@
+from collections import namedtuple
 from enum import Enum
 import re
 
 BlockType = Enum("BlockType", ["paragraph", "heading", "code", "quote", "unordered_list", "ordered_list"])
 
+# start and end are 1-based source line numbers, inclusive.
+Block = namedtuple("Block", ["type", "lines", "start", "end"])
+
+HEADING_PATTERN = re.compile(r"^(#{1,6}) ")
+FENCE = "```"
+
 def markdown_to_blocks(markdown):
-    blocks = [block.strip() for block in markdown.split("\n\n")]
-    result_blocks = []
-    heading_pattern = re.compile(r"^(#{1,6}) .*")
-    for block in blocks:
-        lines = block.split("\n")
-        temp = []
-        for line in lines:
-            if heading_pattern.match(line):
-                if temp:
-                    result_blocks.append("\n".join(temp).strip())
-                    temp = []
-                result_blocks.append(line.strip())
-            else:
-                temp.append(line)
-        if temp:
-            result_blocks.append("\n".join(temp).strip())
-            
-    return [b for b in result_blocks if b]
+    return ["\n".join(block.lines) for block in iter_blocks(markdown.split("\n"))]
 
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return lines_to_block_type(block.split("\n"))
+
+def lines_to_block_type(lines):
     if lines[0].startswith("#"):
-        if re.match(r"^#{1,6} ", lines[0]):
+        if HEADING_PATTERN.match(lines[0]):
             return BlockType.heading
-    if lines[0].startswith("```") and lines[-1].startswith("```"):
+    if lines[0].startswith(FENCE) and lines[-1].startswith(FENCE):
         return BlockType.code
     if all(line.startswith(">") for line in lines):
         return BlockType.quote
@@ -44,3 +36,51 @@ def block_to_block_type(block):
 
     return BlockType.paragraph
 
+def make_block(lines, start):
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return Block(lines_to_block_type(lines), lines, start, start + len(lines) - 1)
+
+def iter_blocks(lines):
+    # One forward pass: blank lines end a block, headings stand alone, and a fenced
+    # code block runs to its closing fence even across blank lines.
+    current = []
+    start = 0
+    in_fence = False
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if in_fence:
+            current.append(line)
+            if line.lstrip().startswith(FENCE):
+                yield make_block(current, start)
+                current = []
+                in_fence = False
+            continue
+        stripped = line.strip()
+        if not stripped:
+            if current:
+                yield make_block(current, start)
+                current = []
+            continue
+        if stripped.startswith(FENCE):
+            if current:
+                yield make_block(current, start)
+            current = [line]
+            start = number
+            if len(stripped) > len(FENCE) and stripped.endswith(FENCE):
+                yield make_block(current, start)
+                current = []
+            else:
+                in_fence = True
+            continue
+        if HEADING_PATTERN.match(stripped if not current else line):
+            if current:
+                yield make_block(current, start)
+                current = []
+            yield make_block([line], number)
+            continue
+        if not current:
+            start = number
+        current.append(line)
+    if current:
+        yield make_block(current, start)
@@ -0,0 +1,31 @@
+import re
+
+# Conditional comments are markup for old browsers, so they are kept.
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# Whitespace that spans a line break between two tags is indentation.
+INDENT_PATTERN = re.compile(r">\s*\n\s*<")
+SPACE_PATTERN = re.compile(r"\s+")
+# Quotes stay when "/>" follows, or the slash would be read as part of the unquoted value.
+QUOTED_ATTR_PATTERN = re.compile(r'(\s[\w:-]+)="([^\s"\'=<>`]+)"(?!/)')
+UNQUOTED_VALUE_PATTERN = re.compile(r'[^\s"\'=<>`]+')
+PRESERVE_TAGS = ("pre", "textarea", "script", "style")
+
+def collapse_whitespace(text):
+    # Most text nodes have nothing to collapse; the substring checks are far cheaper than the regex.
+    if "  " in text or "\n" in text or "\t" in text or "\r" in text:
+        return SPACE_PATTERN.sub(" ", text)
+    return text
+
+def attribute(key, value):
+    if type(value) is str and UNQUOTED_VALUE_PATTERN.fullmatch(value):
+        return f" {key}={value}"
+    return f' {key}="{value}"'
+
+def minify_html(html):
+    # For template literals: they are minified once per template, not once per page.
+    if any(f"<{tag}" in html for tag in PRESERVE_TAGS):
+        return html
+    html = COMMENT_PATTERN.sub("", html)
+    html = INDENT_PATTERN.sub("><", html)
+    html = collapse_whitespace(html)
+    return QUOTED_ATTR_PATTERN.sub(r"\1=\2", html)
@@ -0,0 +1,93 @@
+import marshal
+import os
+import threading
+from htmlnode import LeafNode, ParentNode
+from manifest import CACHE_DIR, hash_bytes
+
+# Bump whenever a change to markdown parsing alters the node tree.
+PARSER_VERSION = "3"
+
+LEAF = 0
+PARENT = 1
+new_node = object.__new__
+
+def node_to_tuple(node):
+    if isinstance(node, ParentNode):
+        return (PARENT, node.tag, node.props, tuple(node_to_tuple(child) for child in node.children))
+    return (LEAF, node.tag, node.value, node.props)
+
+def tuple_to_node(data):
+    # The tuples were made from valid nodes, so the slots are filled in directly
+    # instead of going through the constructors' checks again. marshal keeps
+    # interned strings interned, so tags still share one object per name.
+    if data[0] == PARENT:
+        node = new_node(ParentNode)
+        node.tag = data[1]
+        node.value = None
+        node.children = [tuple_to_node(child) for child in data[3]]
+        node.props = data[2]
+    else:
+        node = new_node(LeafNode)
+        node.tag = data[1]
+        node.value = data[2]
+        node.children = None
+        node.props = data[3]
+    return node
+
+class ParseCache:
+    def __init__(self, directory=os.path.join(CACHE_DIR, "ast"), max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, markdown):
+        return hash_bytes(f"{PARSER_VERSION}\0{markdown}".encode("utf-8"))
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            # marshal.load() reads a file object in small pieces; one read() and loads() is faster.
+            with open(path, "rb") as f:
+                title, tree, links = marshal.loads(f.read())
+            # mtime doubles as the last-used time for LRU eviction.
+            os.utime(path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return title, tuple_to_node(tree), links
+
+    def put(self, key, title, node, links=()):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name + rename keeps concurrent builds from seeing partial entries.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump((title, node_to_tuple(node), list(links)), f)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.directory):
+            for file in files:
+                if file.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        for mtime_ns, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
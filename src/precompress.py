@@ -0,0 +1,96 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from buildreport import log
+from manifest import manifest_path, load_manifest, save_manifest, remove_output, write_if_changed
+
+COMPRESSIBLE = (".html", ".css", ".svg", ".js")
+# A .gz sibling has to save at least this fraction of the original to be kept.
+MIN_SAVING = 0.1
+
+def find_compressible(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file in sorted(files):
+            if file.endswith(COMPRESSIBLE):
+                yield os.path.join(root, file)
+
+def compress_file(path, previous=None):
+    gz_path = path + ".gz"
+    st = os.stat(path)
+    record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        record["gz"] = previous.get("gz", 0)
+        if not record["gz"] or os.path.exists(gz_path):
+            return record, "unchanged", None
+
+    with open(path, "rb") as f:
+        data = f.read()
+    # mtime=0 keeps the output byte-identical across builds of the same input.
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) > len(data) * (1 - MIN_SAVING):
+        record["gz"] = 0
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            return record, "removed", None
+        return record, "skipped", None
+
+    record["gz"] = len(compressed)
+    status, digest = write_if_changed(gz_path, lambda f: f.write(compressed))
+    # The server only trusts a sibling at least as new as its original, so the two share an mtime.
+    os.utime(gz_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return record, status, digest
+
+def precompress(directory, manifest_file=None, workers=None, deploy=None):
+    manifest_file = manifest_file or manifest_path(directory, "gzip")
+    old_files = load_manifest(manifest_file).get("files", {})
+    paths = list(find_compressible(directory))
+
+    # zlib releases the GIL while compressing, so threads scale across cores.
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda path: compress_file(path, old_files.get(os.path.relpath(path, directory))), paths))
+
+    files = {}
+    counts = {"compressed": 0, "unchanged": 0, "skipped": 0}
+    original_size = compressed_size = 0
+    for path, (record, status, digest) in zip(paths, results):
+        files[os.path.relpath(path, directory)] = record
+        if record["gz"]:
+            original_size += record["size"]
+            compressed_size += record["gz"]
+        if status in ("added", "changed"):
+            counts["compressed"] += 1
+            log.debug(f"Compressed {path} ({record['size']} -> {record['gz']} bytes)")
+            if deploy is not None:
+                deploy.record(path + ".gz", status, digest)
+        elif status == "removed":
+            # No longer worth compressing: the sibling an earlier build published is gone.
+            counts["skipped"] += 1
+            if deploy is not None:
+                deploy.remove(path + ".gz")
+        else:
+            counts[status] += 1
+
+    # Siblings of outputs that no longer exist are removed with them.
+    for rel_path, previous in old_files.items():
+        gz_path = os.path.join(directory, rel_path) + ".gz"
+        if rel_path not in files and os.path.exists(gz_path):
+            remove_output(gz_path, directory)
+            if deploy is not None:
+                deploy.remove(gz_path)
+
+    save_manifest(manifest_file, {"files": files})
+    return counts["compressed"], counts["unchanged"], counts["skipped"], original_size - compressed_size, original_size
+
+def drop_stale(directory, deploy):
+    # Without --gzip nothing refreshes the siblings, so those of outputs this build
+    # rewrote or removed go too, instead of being served in place of the new bytes
+    # or keeping a deleted page's directory alive.
+    dropped = 0
+    for rel_path in list(deploy.added) + list(deploy.changed) + list(deploy.removed):
+        gz_path = os.path.join(directory, rel_path) + ".gz"
+        if rel_path.endswith(COMPRESSIBLE) and os.path.exists(gz_path):
+            remove_output(gz_path, directory)
+            deploy.remove(gz_path)
+            dropped += 1
+    return dropped
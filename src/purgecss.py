@@ -0,0 +1,198 @@
+import os
+import re
+from assets import walk_files
+from htmlnode import ParentNode
+from manifest import CACHE_DIR, hash_bytes, save_manifest, load_manifest, write_if_changed
+
+# Bump whenever a change to the analysis alters what gets purged.
+PURGE_VERSION = "1"
+# Inlined CSS has to fit the first round trip alongside the page to be worth it.
+INLINE_LIMIT = 14 * 1024
+
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+PARENS_PATTERN = re.compile(r"\([^()]*\)")
+PSEUDO_PATTERN = re.compile(r"::?[\w-]+")
+ATTRIBUTE_PATTERN = re.compile(r"\[[^\]]*\]")
+COMPOUND_PATTERN = re.compile(r"^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+TAG_PATTERN = re.compile(r"<([a-zA-Z][\w-]*)")
+HTML_ATTR_PATTERN = re.compile(r"""\b(class|id)=(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+# At-rules whose blocks hold ordinary rules that can be purged one by one.
+NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+
+def node_selectors(node):
+    used = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.tag is not None:
+            used.add(node.tag.lower())
+        if node.props:
+            add_attribute_selectors(used, "class", node.props.get("class"))
+            add_attribute_selectors(used, "id", node.props.get("id"))
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    return used
+
+def add_attribute_selectors(used, name, value):
+    if not value:
+        return
+    if name == "class":
+        used.update("." + cls for cls in value.split())
+    else:
+        used.add("#" + value)
+
+def html_selectors(html):
+    used = {tag.lower() for tag in TAG_PATTERN.findall(html)}
+    for match in HTML_ATTR_PATTERN.finditer(html):
+        add_attribute_selectors(used, match.group(1), match.group(2) or match.group(3) or match.group(4))
+    return used
+
+def template_selectors(template):
+    # Computed once per compiled template and reused for every page that uses it.
+    if template.selectors is None:
+        template.selectors = html_selectors("".join(s for s in template.segments if isinstance(s, str)))
+    return template.selectors
+
+def selector_requirements(selector):
+    # What a selector needs on the page to possibly match. Anything the analysis
+    # does not understand yields None, and the selector is kept.
+    selector = selector.strip()
+    while "(" in selector:
+        stripped = PARENS_PATTERN.sub("", selector)
+        if stripped == selector:
+            return None
+        selector = stripped
+    selector = ATTRIBUTE_PATTERN.sub("", PSEUDO_PATTERN.sub("", selector)).replace("*", "")
+    required = []
+    for compound in re.split(r"[\s>+~]+", selector):
+        if not compound:
+            continue
+        match = COMPOUND_PATTERN.match(compound)
+        if match is None:
+            return None
+        if match.group(1):
+            required.append(match.group(1).lower())
+        required.extend(re.findall(r"[.#][\w-]+", match.group(2)))
+    return required
+
+def split_top_level(text, separator):
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+def find_block_end(css, start):
+    # Index of the "}" closing the block whose "{" is at start, skipping strings.
+    depth = 0
+    quote = None
+    i = start
+    while i < len(css):
+        char = css[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced braces in stylesheet")
+
+def parse_css(css):
+    # Items are ["rule", [[selector, requirements], ...], body], ["block", prelude, items]
+    # or ["raw", text]; plain lists so the analysis round-trips through JSON.
+    css = CSS_COMMENT_PATTERN.sub("", css)
+    items = []
+    pos = 0
+    while True:
+        brace = css.find("{", pos)
+        semicolon = css.find(";", pos)
+        if brace == -1 and semicolon == -1:
+            break
+        if semicolon != -1 and (brace == -1 or semicolon < brace):
+            items.append(["raw", css[pos:semicolon + 1].strip()])
+            pos = semicolon + 1
+            continue
+        prelude = css[pos:brace].strip()
+        end = find_block_end(css, brace)
+        body = css[brace + 1:end]
+        if prelude.startswith(NESTED_AT_RULES):
+            items.append(["block", prelude, parse_css(body)])
+        elif prelude.startswith("@"):
+            items.append(["raw", css[pos:end + 1].strip()])
+        else:
+            selectors = [s.strip() for s in split_top_level(prelude, ",")]
+            items.append(["rule", [[s, selector_requirements(s)] for s in selectors], body.strip()])
+        pos = end + 1
+    return items
+
+def render_css(items, used):
+    out = []
+    for item in items:
+        if item[0] == "raw":
+            out.append(item[1])
+        elif item[0] == "block":
+            inner = render_css(item[2], used)
+            if inner:
+                out.append(f"{item[1]}{{{inner}}}")
+        else:
+            kept = [s for s, required in item[1] if required is None or used.issuperset(required)]
+            if kept:
+                out.append(f"{','.join(kept)}{{{item[2]}}}")
+    return "\n".join(out)
+
+def analyze_stylesheet(path, cache_dir=os.path.join(CACHE_DIR, "css")):
+    with open(path, "r", encoding="utf-8") as f:
+        css = f.read()
+    key = hash_bytes(f"{PURGE_VERSION}\0{css}".encode("utf-8"))
+    cache_file = os.path.join(cache_dir, f"{key}.json")
+    cached = load_manifest(cache_file)
+    if cached:
+        return cached["items"]
+    items = parse_css(css)
+    save_manifest(cache_file, {"source": path, "items": items})
+    return items
+
+def site_selectors(manifest_file):
+    used = set()
+    for record in load_manifest(manifest_file).get("pages", {}).values():
+        used.update(record.get("selectors", ()))
+    return used
+
+def find_stylesheets(source):
+    return [rel_path for rel_path, source_file in walk_files(source) if rel_path.endswith(".css")]
+
+def purge_stylesheets(source, stylesheets, used):
+    # Keyed by site path, like the asset map: {"/index.css": "body{...}"}.
+    return {
+        "/" + rel_path.replace(os.sep, "/"): render_css(analyze_stylesheet(os.path.join(source, rel_path)), used) + "\n"
+        for rel_path in stylesheets
+    }
+
+def write_stylesheets(target, purged, deploy=None):
+    for site_path, css in purged.items():
+        target_file = os.path.join(target, *site_path.split("/"))
+        os.makedirs(os.path.dirname(target_file), exist_ok=True)
+        status, digest = write_if_changed(target_file, lambda f: f.write(css))
+        if deploy is not None:
+            deploy.record(target_file, status, digest)
+
+def inline_styles(purged):
+    if sum(len(css) for css in purged.values()) > INLINE_LIMIT:
+        return None
+    return purged
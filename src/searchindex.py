@@ -0,0 +1,159 @@
+import json
+import os
+import re
+from htmlnode import ParentNode
+from manifest import manifest_path, load_manifest, save_manifest, remove_output, write_if_changed
+
+# Bump whenever tokenizing or the file format changes; the index is then rebuilt from scratch.
+SEARCH_VERSION = "1"
+SEARCH_DIR = "search"
+# Terms are sharded by their first characters, so a query only fetches the shards its terms need.
+SHARD_PREFIX = 2
+# Words longer than 32 characters are mostly hashes and URLs, and are not indexed.
+TOKEN_PATTERN = re.compile(r"\b\w{1,32}\b")
+SHARD_PATTERN = re.compile(r"[a-z0-9]+$")
+
+def node_text(node, parts):
+    # Inline leaves of a block are contiguous text; block and list item
+    # boundaries separate words. Code blocks are left out of the index.
+    if isinstance(node, ParentNode):
+        if node.tag == "pre":
+            return parts
+        for child in node.children:
+            node_text(child, parts)
+        parts.append(" ")
+    elif node.tag == "img":
+        parts.append(f" {node.props.get('alt', '')} ")
+    elif node.value:
+        parts.append(node.value)
+    return parts
+
+def add_postings(postings, node, position=0):
+    # Adds the word positions of node's text to postings ({term: [position, ...]})
+    # and returns the position the next node starts at.
+    tokens = TOKEN_PATTERN.findall("".join(node_text(node, [])).lower())
+    for index, token in enumerate(tokens, position):
+        positions = postings.get(token)
+        if positions is None:
+            postings[token] = [index]
+        else:
+            positions.append(index)
+    return position + len(tokens)
+
+def shard_name(term):
+    prefix = term[:SHARD_PREFIX]
+    return prefix if SHARD_PATTERN.match(prefix) else "_"
+
+def encode_positions(page_id, positions):
+    # [page_id, first position, gap, gap, ...]: gaps keep the numbers, and the JSON, short.
+    encoded = [page_id, positions[0]]
+    encoded.extend(b - a for a, b in zip(positions, positions[1:]))
+    return encoded
+
+def page_url(dest_path, dest_dir):
+    # Relative to the site root, so every basepath target shares one index.
+    url = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if url == "index.html":
+        return ""
+    if url.endswith("/index.html"):
+        return url[:-len("index.html")]
+    return url
+
+def write_json(path, data, deploy=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # dumps() uses the C encoder; dump() would encode and write chunk by chunk in Python.
+    text = json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    status, digest = write_if_changed(path, lambda f: f.write(text))
+    if deploy is not None:
+        deploy.record(path, status, digest)
+    return status
+
+class SearchIndex:
+    # Inverted index of page text written to <dest>/search/: pages.json lists
+    # [url, title] by page id, and <prefix>.json maps each term to
+    # [[page_id, position, gap, ...], ...]. Page ids stay put between builds,
+    # so a rebuild only rewrites the shards holding a changed page's terms.
+    def __init__(self, dest_dir, state_file=None):
+        self.dest_dir = dest_dir
+        self.state_file = state_file or manifest_path(dest_dir, "search")
+        state = load_manifest(self.state_file)
+        if state.get("version") != SEARCH_VERSION or not os.path.exists(self.index_path(dest_dir, "pages")):
+            # Without the shards on disk the recorded pages cannot be trusted; index everything again.
+            state = {}
+        self.pages = state.get("pages", {})
+        self.updates = {}
+        self.written = 0
+
+    def index_path(self, dest_dir, name):
+        return os.path.join(dest_dir, SEARCH_DIR, f"{name}.json")
+
+    def needs(self, rel_path, source_hash):
+        # Builds without the index still render edited pages, so the index checks the
+        # source hash it was built from rather than relying on the page being pending.
+        record = self.pages.get(rel_path)
+        return record is None or record.get("hash") != source_hash
+
+    def update(self, rel_path, url, title, postings, source_hash):
+        self.updates[rel_path] = (url, title, postings, source_hash)
+
+    def write(self, live, outputs):
+        # live is the set of pages the site has now; outputs is [(dest_dir, deploy), ...].
+        removed = [rel_path for rel_path in self.pages if rel_path not in live]
+        dropped = set()
+        touched = set()
+        for rel_path in removed + [rel_path for rel_path in self.updates if rel_path in self.pages]:
+            dropped.add(self.pages[rel_path]["id"])
+            touched.update(self.pages[rel_path]["shards"])
+        for rel_path in removed:
+            del self.pages[rel_path]
+
+        used = {record["id"] for record in self.pages.values()}
+        free = (page_id for page_id in range(len(self.pages) + len(self.updates) + 1) if page_id not in used)
+        added = {}
+        for rel_path, (url, title, postings, source_hash) in sorted(self.updates.items()):
+            if rel_path not in live:
+                continue
+            record = self.pages.get(rel_path) or {"id": next(free)}
+            shards = set()
+            for term, positions in postings.items():
+                shard = shard_name(term)
+                shards.add(shard)
+                added.setdefault(shard, {}).setdefault(term, []).append(encode_positions(record["id"], positions))
+            self.pages[rel_path] = {"id": record["id"], "url": url, "title": title, "shards": sorted(shards), "hash": source_hash}
+            touched.update(shards)
+
+        written = 0
+        for shard in sorted(touched):
+            entries = load_manifest(self.index_path(self.dest_dir, shard))
+            if dropped:
+                for term in list(entries):
+                    entries[term] = [posting for posting in entries[term] if posting[0] not in dropped]
+                    if not entries[term]:
+                        del entries[term]
+            for term, postings in added.get(shard, {}).items():
+                entries[term] = sorted(entries.get(term, []) + postings)
+            # Shards whose bytes come out the same are left untouched on disk.
+            for dest_dir, deploy in outputs:
+                path = self.index_path(dest_dir, shard)
+                if entries:
+                    status = write_json(path, entries, deploy)
+                elif os.path.exists(path):
+                    remove_output(path, dest_dir)
+                    status = "removed"
+                    if deploy is not None:
+                        deploy.remove(path)
+                else:
+                    status = "unchanged"
+            written += status != "unchanged"
+
+        pages = [None] * (max((record["id"] for record in self.pages.values()), default=-1) + 1)
+        shards = set()
+        for record in self.pages.values():
+            pages[record["id"]] = [record["url"], record["title"]]
+            shards.update(record["shards"])
+        index = {"version": SEARCH_VERSION, "prefix": SHARD_PREFIX, "pages": pages, "shards": sorted(shards)}
+        for dest_dir, deploy in outputs:
+            write_json(self.index_path(dest_dir, "pages"), index, deploy)
+        save_manifest(self.state_file, {"version": SEARCH_VERSION, "pages": self.pages})
+        self.updates = {}
+        self.written = written
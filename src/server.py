@@ -0,0 +1,325 @@
+import argparse
+import functools
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    '<script>new EventSource("' + RELOAD_PATH + '").onmessage = function () { location.reload(); };</script>'
+).encode("utf-8")
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+# Files above this size are streamed from disk instead of being held in the cache.
+MAX_CACHED_FILE = 8 * 1024 * 1024
+COPY_CHUNK = 256 * 1024
+
+class LiveReload:
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class CachedFile:
+    def __init__(self, path, st, body):
+        self.path = path
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size
+        self.body = body
+        # Size and mtime are enough to tell versions apart, and cost nothing to compute.
+        self.etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.mtime = int(st.st_mtime)
+
+class FileCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        # One stat() per request revalidates the entry; the file is only read again when it changed.
+        st = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                self.entries.move_to_end(path)
+                return entry
+        if st.st_size > MAX_CACHED_FILE or st.st_size > self.max_bytes:
+            return CachedFile(path, st, None)
+        with open(path, "rb") as f:
+            entry = CachedFile(path, st, f.read())
+        if len(entry.body) != st.st_size:
+            # Changed while it was read; serve it but let the next request read it again.
+            return entry
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total -= old.size
+            self.entries[path] = entry
+            self.total += entry.size
+            while self.total > self.max_bytes:
+                evicted_path, evicted = self.entries.popitem(last=False)
+                self.total -= evicted.size
+        return entry
+
+def parse_range(header, size):
+    # Single byte ranges only; anything else is answered with the whole file.
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+    if start == "":
+        length = int(end)
+        if length == 0:
+            return "unsatisfiable"
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+def gzip_sibling(path):
+    # A .gz older than its original was left by an earlier build and no longer matches it.
+    try:
+        return path + ".gz" if os.stat(path + ".gz").st_mtime_ns >= os.stat(path).st_mtime_ns else None
+    except OSError:
+        return None
+
+class StaticRequestHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between requests.
+    protocol_version = "HTTP/1.1"
+    cache = None
+    access_log = True
+
+    def do_GET(self):
+        self.serve(head=False)
+
+    def do_HEAD(self):
+        self.serve(head=True)
+
+    def resolve(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if os.path.isfile(index):
+                return index
+            return None
+        return path if os.path.isfile(path) else None
+
+    def needs_slash(self):
+        return os.path.isdir(self.translate_path(self.path)) and not self.path.split("?", 1)[0].endswith("/")
+
+    def serve(self, head):
+        if self.needs_slash():
+            # Let the stock handler redirect to the trailing slash or list the directory.
+            return super().do_HEAD() if head else super().do_GET()
+        path = self.resolve()
+        if path is None:
+            return super().do_HEAD() if head else super().do_GET()
+        content_type = self.guess_type(path)
+
+        range_header = self.headers.get("Range")
+        encoding = None
+        if range_header is None and "gzip" in self.headers.get("Accept-Encoding", ""):
+            # Precompressed siblings are served as-is; range requests get the identity encoding.
+            sibling = gzip_sibling(path)
+            if sibling is not None:
+                path = sibling
+                encoding = "gzip"
+        try:
+            entry = self.cache.get(path)
+        except OSError:
+            # Removed by a rebuild between the lookup and the read.
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        if self.not_modified(entry):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(entry, encoding)
+            self.end_headers()
+            return
+
+        start, end = 0, entry.size - 1
+        status = HTTPStatus.OK
+        if range_header is not None and self.range_applies(entry):
+            byte_range = parse_range(range_header, entry.size)
+            if byte_range == "unsatisfiable":
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{entry.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{entry.size}")
+        self.send_validators(entry, encoding)
+        self.end_headers()
+        if not head:
+            self.send_body(entry, start, end)
+
+    def send_validators(self, entry, encoding):
+        self.send_header("ETag", entry.etag)
+        self.send_header("Last-Modified", entry.last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+
+    def not_modified(self, entry):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or entry.etag in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return entry.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+        return False
+
+    def range_applies(self, entry):
+        # If-Range: only send the part when the client's copy is still current.
+        if_range = self.headers.get("If-Range")
+        return if_range is None or if_range.strip() in (entry.etag, entry.last_modified)
+
+    def send_body(self, entry, start, end):
+        try:
+            if entry.body is not None:
+                self.wfile.write(memoryview(entry.body)[start:end + 1])
+                return
+            with open(entry.path, "rb") as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(COPY_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+class DevRequestHandler(StaticRequestHandler):
+    livereload = None
+
+    def do_GET(self):
+        if self.livereload is not None and self.path == RELOAD_PATH:
+            self.send_event_stream()
+            return
+        # Directories without the trailing slash are redirected first, as in production,
+        # so relative URLs resolve the same way in the dev server.
+        path = None if self.needs_slash() else self.resolve()
+        if self.livereload is not None and path is not None and path.endswith(".html"):
+            self.send_html_with_reload(path)
+            return
+        super().do_GET()
+
+    def send_html_with_reload(self, path):
+        try:
+            body = self.cache.get(path).body
+            if body is None:
+                with open(path, "rb") as f:
+                    body = f.read()
+        except OSError:
+            # Removed by a rebuild between the lookup and the read.
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        index = body.rfind(b"</body>")
+        body = body[:index] + RELOAD_SCRIPT + body[index:] if index != -1 else body + RELOAD_SCRIPT
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_event_stream(self):
+        # The stream has no length, so it ends the connection instead of keeping it alive.
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        version = self.livereload.version
+        try:
+            while True:
+                current = self.livereload.wait(version, timeout=15)
+                if current != version:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = current
+                else:
+                    # Comment lines keep proxies and the browser from timing the stream out.
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if self.path != RELOAD_PATH:
+            super().log_message(format, *args)
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections as soon as a load test ramps up.
+    request_queue_size = 128
+
+def make_server(directory, port, livereload=None, host="", cache_bytes=64 * 1024 * 1024, access_log=True):
+    attrs = {"livereload": livereload, "cache": FileCache(cache_bytes), "access_log": access_log}
+    handler = functools.partial(type("Handler", (DevRequestHandler,), attrs), directory=directory)
+    return StaticServer((host, port), handler)
+
+def serve_in_background(directory, port, livereload=None, host=""):
+    server = make_server(directory, port, livereload, host)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the built site with caching, validators, gzip and range support.")
+    parser.add_argument("directory", nargs="?", default="docs")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--host", default="")
+    parser.add_argument("--cache-mb", type=int, default=64, help="memory for cached file contents")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not log every request")
+    args = parser.parse_args()
+    server = make_server(args.directory, args.port, host=args.host, cache_bytes=args.cache_mb * 1024 * 1024, access_log=not args.quiet)
+    print(f"Serving {args.directory}/ on http://{args.host or 'localhost'}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -71,7 +71,84 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
+# Image and link text may not contain a delimiter, and a link may not contain an
+# image, matching the old pass order: delimiters, then images, then links.
+def _inline_chars(close, guard=""):
+    return r'(?:' + guard + r'(?:[^`_*' + close + r']|\*(?!\*)))'
+
+def _bracketed(group, guard=""):
+    text = _inline_chars(r'\]', guard)
+    url = _inline_chars(r'\)', guard)
+    if group:
+        return r'\[(' + text + r'+)\]\((' + url + r'+)\)'
+    return r'\[' + text + r'+\]\(' + url + r'+\)'
+
+INLINE_PATTERN = re.compile(
+    r'(?=[`*_!\[])(?:(`)|(\*\*)|(_)'
+    r'|!' + _bracketed(True) +
+    r'|(?<!!)' + _bracketed(True, r'(?!!' + _bracketed(False) + r')') + r')'
+)
+# Inside bold only "`" and "**" end the run; inside italic "_" does too.
+BOLD_END_PATTERN = re.compile(r'`|\*\*')
+ITALIC_END_PATTERN = re.compile(r'`|\*\*|_')
+
 def text_to_textnodes(text):
+    # One left-to-right scan. A backtick resets bold/italic and "**" resets italic,
+    # mirroring the old code -> bold -> italic -> image -> link split order.
+    nodes = []
+    append = nodes.append
+    state = TextType.TEXT
+    pos = 0
+    length = len(text)
+    while pos < length:
+        if state is TextType.TEXT:
+            match = INLINE_PATTERN.search(text, pos)
+            if match is None:
+                break
+            start, end = match.span()
+            if start > pos:
+                append(TextNode(text[pos:start], TextType.TEXT))
+            kind = match.lastindex
+            if kind == 1:
+                state = TextType.CODE
+            elif kind == 2:
+                state = TextType.BOLD
+            elif kind == 3:
+                state = TextType.ITALIC
+            elif kind == 5:
+                append(TextNode(match.group(4), TextType.IMAGE, match.group(5)))
+            else:
+                append(TextNode(match.group(6), TextType.LINK, match.group(7)))
+            pos = end
+            continue
+
+        if state is TextType.CODE:
+            start = text.find("`", pos)
+            if start == -1:
+                break
+            end = start + 1
+            next_state = TextType.TEXT
+        else:
+            match = (BOLD_END_PATTERN if state is TextType.BOLD else ITALIC_END_PATTERN).search(text, pos)
+            if match is None:
+                break
+            start, end = match.span()
+            delimiter = match.group()
+            if delimiter == "`":
+                next_state = TextType.CODE
+            elif delimiter == "**":
+                next_state = TextType.TEXT if state is TextType.BOLD else TextType.BOLD
+            else:
+                next_state = TextType.TEXT
+        if start > pos:
+            append(TextNode(text[pos:start], state))
+        state = next_state
+        pos = end
+    if pos < length:
+        append(TextNode(text[pos:], state))
+    return nodes
+
+def text_to_textnodes_multipass(text):
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
     nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
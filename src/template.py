@@ -0,0 +1,119 @@
+import os
+import re
+from manifest import hash_bytes
+from minify import minify_html
+
+TOKEN_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}|\{%\s*include\s+[\"']([^\"']+)[\"']\s*%\}")
+LAYOUT_NAME = "layout.html"
+
+_cache = {}
+
+class Template:
+    def __init__(self, path, segments, dependencies, fingerprint):
+        self.path = path
+        self.segments = segments
+        self.dependencies = dependencies
+        self.fingerprint = fingerprint
+        self.slots = [(index, segment) for index, segment in enumerate(segments) if isinstance(segment, tuple)]
+        self.minified = None
+        self.selectors = None
+        self.urls = None
+
+    def render(self, context):
+        parts = list(self.segments)
+        for index, (name, raw) in self.slots:
+            value = context.get(name, raw)
+            parts[index] = value.to_html() if hasattr(value, "to_html") else value
+        return "".join(parts)
+
+    def minified_segments(self):
+        if self.minified is None:
+            segments = [segment if isinstance(segment, tuple) else minify_html(segment) for segment in self.segments]
+            if segments and isinstance(segments[0], str):
+                segments[0] = segments[0].lstrip()
+            if segments and isinstance(segments[-1], str):
+                segments[-1] = segments[-1].rstrip()
+            self.minified = segments
+        return self.minified
+
+    def write(self, sink, context, minify=False, rewrite=None):
+        # Node values are streamed into the sink instead of being rendered to a string first.
+        # rewrite, if given, maps href/src URLs: node props as they are emitted, and the
+        # template's own markup through rewrite.literal().
+        for segment in self.minified_segments() if minify else self.segments:
+            if isinstance(segment, tuple):
+                value = context.get(segment[0], segment[1])
+                if hasattr(value, "write_html"):
+                    value.write_html(sink, minify, rewrite)
+                else:
+                    sink.write(value)
+            elif rewrite is not None:
+                sink.write(rewrite.literal(segment))
+            else:
+                sink.write(segment)
+
+    def is_stale(self):
+        for path, mtime_ns in self.dependencies.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+def compile_template(path, dependencies=None, sources=None, stack=()):
+    path = os.path.abspath(path)
+    if path in stack:
+        raise Exception(f"Template include cycle: {' -> '.join(stack + (path,))}")
+    dependencies = {} if dependencies is None else dependencies
+    sources = [] if sources is None else sources
+    dependencies[path] = os.stat(path).st_mtime_ns
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    sources.append(source)
+
+    segments = []
+    last_index = 0
+    for match in TOKEN_PATTERN.finditer(source):
+        if match.start() > last_index:
+            segments.append(source[last_index:match.start()])
+        name, include = match.groups()
+        if include is not None:
+            include_path = os.path.join(os.path.dirname(path), include)
+            partial = compile_template(include_path, dependencies, sources, stack + (path,))
+            segments.extend(partial.segments)
+        else:
+            segments.append((name, match.group(0)))
+        last_index = match.end()
+    if last_index < len(source):
+        segments.append(source[last_index:])
+
+    # Merge adjacent literals so rendering joins as few strings as possible.
+    merged = []
+    for segment in segments:
+        if merged and isinstance(segment, str) and isinstance(merged[-1], str):
+            merged[-1] += segment
+        else:
+            merged.append(segment)
+    fingerprint = hash_bytes("\0".join(sources).encode("utf-8"))
+    return Template(path, merged, dependencies, fingerprint)
+
+def load_template(path):
+    key = os.path.abspath(path)
+    template = _cache.get(key)
+    if template is None or template.is_stale():
+        template = compile_template(key)
+        _cache[key] = template
+    return template
+
+def find_layout(from_path, content_root, default_template):
+    # The nearest layout.html between the page and the content root wins.
+    directory = os.path.dirname(os.path.abspath(from_path))
+    content_root = os.path.abspath(content_root)
+    while True:
+        layout = os.path.join(directory, LAYOUT_NAME)
+        if os.path.isfile(layout):
+            return layout
+        if directory == content_root or os.path.dirname(directory) == directory:
+            return default_template
+        directory = os.path.dirname(directory)
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import unittest
+from src.assets import sync_assets, publish_file, load_asset_map, fingerprint_name, is_fingerprinted, PUBLISH_MODES
+from src.manifest import DeployManifest
+
+class TestSyncAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.target = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "assets.json")
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+        self.write(os.path.join(self.source, "images", "a.png"), "png-bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def sync(self, use_hash=False, mode="copy"):
+        return sync_assets(self.source, self.target, use_hash, self.manifest, mode=mode)
+
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_initial_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.target, "images", "a.png")))
+
+    def test_unchanged_files_are_left_alone(self):
+        self.sync()
+        self.assertEqual(self.sync(), (0, 2, 0))
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync(), (1, 1, 0))
+
+    def test_hash_mode_skips_touched_but_identical_files(self):
+        self.sync()
+        source_file = os.path.join(self.source, "index.css")
+        st = os.stat(source_file)
+        os.utime(source_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertEqual(self.sync(use_hash=True), (0, 2, 0))
+        self.assertEqual(self.sync(), (0, 2, 0))
+
+    def test_removed_source_is_deleted_but_pages_are_kept(self):
+        self.sync()
+        self.write(os.path.join(self.target, "index.html"), "<html></html>")
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.target, "index.html")))
+
+    def test_deploy_manifest_records_asset_changes(self):
+        self.sync()
+        deploy = DeployManifest(self.target)
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        sync_assets(self.source, self.target, manifest_file=self.manifest, deploy=deploy)
+        self.assertEqual(list(deploy.changed), ["index.css"])
+        self.assertEqual(deploy.removed, ["images/a.png"])
+
+    def test_every_mode_publishes_the_same_bytes(self):
+        for mode in PUBLISH_MODES:
+            target_file = os.path.join(self.tmp.name, f"out-{mode}.css")
+            try:
+                publish_file(os.path.join(self.source, "index.css"), target_file, mode)
+            except OSError:
+                # Not every filesystem can clone; sync_assets falls back to copy then.
+                self.assertEqual(mode, "reflink")
+                self.assertFalse(os.path.exists(target_file))
+                continue
+            self.assertEqual(self.read(target_file), "body {}")
+
+    def test_unsupported_mode_falls_back_to_copy(self):
+        self.assertEqual(self.sync(mode="reflink"), (2, 0, 0))
+        self.assertEqual(self.read(os.path.join(self.target, "index.css")), "body {}")
+
+    def test_hardlink_shares_the_source_inode(self):
+        self.sync(mode="hardlink")
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        target_stat = os.stat(os.path.join(self.target, "index.css"))
+        self.assertEqual(source_stat.st_ino, target_stat.st_ino)
+        self.assertEqual(self.sync(mode="hardlink"), (0, 2, 0))
+
+    def test_hardlinked_source_edited_in_place_is_recorded(self):
+        self.sync(mode="hardlink")
+        deploy = DeployManifest(self.target)
+        # Writing through the existing inode changes the published file's bytes too.
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        self.assertEqual(sync_assets(self.source, self.target, manifest_file=self.manifest, deploy=deploy, mode="hardlink"), (1, 1, 0))
+        self.assertEqual(list(deploy.changed), ["index.css"])
+        self.assertEqual(self.sync(mode="hardlink"), (0, 2, 0))
+
+    def test_switching_between_copy_and_hardlink_republishes(self):
+        self.sync()
+        source_file = os.path.join(self.source, "index.css")
+        target_file = os.path.join(self.target, "index.css")
+        self.assertEqual(self.sync(mode="hardlink"), (2, 0, 0))
+        self.assertEqual(os.stat(source_file).st_ino, os.stat(target_file).st_ino)
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertNotEqual(os.stat(source_file).st_ino, os.stat(target_file).st_ino)
+        self.assertEqual(os.stat(target_file).st_nlink, 1)
+
+    def test_switching_from_symlink_to_copy_replaces_the_link(self):
+        self.sync(mode="symlink")
+        target_file = os.path.join(self.target, "index.css")
+        self.assertTrue(os.path.islink(target_file))
+        self.assertEqual(self.sync(), (2, 0, 0))
+        self.assertFalse(os.path.islink(target_file))
+        self.assertEqual(self.read(os.path.join(self.source, "index.css")), "body {}")
+
+    def test_second_target_links_to_the_first_targets_copies(self):
+        self.sync()
+        mirror = os.path.join(self.tmp.name, "mirror")
+        mirror_manifest = os.path.join(self.tmp.name, "assets-mirror.json")
+        self.assertEqual(sync_assets(self.source, mirror, manifest_file=mirror_manifest, mode="hardlink", origin=self.target), (2, 0, 0))
+        self.assertEqual(os.stat(os.path.join(mirror, "index.css")).st_ino, os.stat(os.path.join(self.target, "index.css")).st_ino)
+        self.assertNotEqual(os.stat(os.path.join(mirror, "index.css")).st_ino, os.stat(os.path.join(self.source, "index.css")).st_ino)
+        self.assertEqual(sync_assets(self.source, mirror, manifest_file=mirror_manifest, mode="hardlink", origin=self.target), (0, 2, 0))
+
+    def test_copy_into_the_first_target_leaves_linked_copies_alone(self):
+        self.sync()
+        mirror = os.path.join(self.tmp.name, "mirror")
+        mirror_manifest = os.path.join(self.tmp.name, "assets-mirror.json")
+        sync_assets(self.source, mirror, manifest_file=mirror_manifest, mode="hardlink", origin=self.target)
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync(), (1, 1, 0))
+        self.assertEqual(self.read(os.path.join(mirror, "index.css")), "body {}")
+        deploy = DeployManifest(mirror)
+        self.assertEqual(sync_assets(self.source, mirror, manifest_file=mirror_manifest, deploy=deploy, mode="hardlink", origin=self.target), (1, 1, 0))
+        self.assertEqual(self.read(os.path.join(mirror, "index.css")), "body { color: red }")
+        self.assertEqual(list(deploy.changed), ["index.css"])
+
+    def test_fingerprint_name_keeps_the_extension(self):
+        self.assertEqual(fingerprint_name("images/a.png", "3f9a1c2e55"), "images/a.3f9a1c2e.png")
+
+    def test_fingerprinted_sync_publishes_hashed_names(self):
+        self.assertEqual(sync_assets(self.source, self.target, manifest_file=self.manifest, fingerprint=True), (2, 0, 0))
+        asset_map = load_asset_map(self.target, self.manifest)
+        self.assertEqual(sorted(asset_map), ["/images/a.png", "/index.css"])
+        self.assertTrue(os.path.exists(self.target + asset_map["/index.css"]))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "index.css")))
+
+    def test_only_referenced_asset_types_are_fingerprinted(self):
+        self.assertTrue(is_fingerprinted(os.path.join("fonts", "body.woff2")))
+        for rel_path in ("CNAME", "robots.txt", "favicon.ico", ".DS_Store", os.path.join(".well-known", "a.png")):
+            self.assertFalse(is_fingerprinted(rel_path))
+        self.write(os.path.join(self.source, "CNAME"), "example.com")
+        self.write(os.path.join(self.source, "images", ".DS_Store"), "")
+        sync_assets(self.source, self.target, manifest_file=self.manifest, fingerprint=True)
+        self.assertTrue(os.path.exists(os.path.join(self.target, "CNAME")))
+        self.assertTrue(os.path.exists(os.path.join(self.target, "images", ".DS_Store")))
+        self.assertEqual(sorted(load_asset_map(self.target, self.manifest)), ["/images/a.png", "/index.css"])
+
+    def test_fingerprint_change_replaces_the_old_name(self):
+        sync_assets(self.source, self.target, manifest_file=self.manifest, fingerprint=True)
+        old_name = load_asset_map(self.target, self.manifest)["/index.css"]
+        self.write(os.path.join(self.source, "index.css"), "body { color: red }")
+        self.assertEqual(sync_assets(self.source, self.target, manifest_file=self.manifest, fingerprint=True), (1, 1, 1))
+        new_name = load_asset_map(self.target, self.manifest)["/index.css"]
+        self.assertNotEqual(old_name, new_name)
+        self.assertFalse(os.path.exists(self.target + old_name))
+
+    def test_unfingerprinted_sync_has_an_empty_asset_map(self):
+        self.sync()
+        self.assertEqual(load_asset_map(self.target, self.manifest), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from src.buildreport import BuildReport, PageTimer
+
+class TestPageTimer(unittest.TestCase):
+    def test_marks_accumulate_per_stage(self):
+        timer = PageTimer()
+        timer.mark("read")
+        timer.mark("write")
+        timer.mark("read")
+        self.assertEqual(set(timer.stages), {"read", "write"})
+        self.assertTrue(all(seconds >= 0 for seconds in timer.stages.values()))
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        self.report = BuildReport()
+        self.report.add_page("a.md", {"read": 0.001, "write": 0.002})
+        self.report.add_page("b.md", {"read": 0.010, "write": 0.001})
+        self.report.add_stage("assets", 0.5)
+
+    def test_stage_totals_include_pages_and_global_stages(self):
+        totals = self.report.stage_totals()
+        self.assertAlmostEqual(totals["read"], 0.011)
+        self.assertAlmostEqual(totals["write"], 0.003)
+        self.assertAlmostEqual(totals["assets"], 0.5)
+
+    def test_slowest_pages(self):
+        self.assertEqual([path for path, stages in self.report.slowest_pages(1)], ["b.md"])
+
+    def test_write_json(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "build.json")
+            self.report.write(path)
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        self.assertEqual(set(data["pages"]), {"a.md", "b.md"})
+        self.assertIn("wall_seconds", data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.generatepage import generate_pages_incremental, generate_targets_incremental, Target, chunk_pages, BuildError, UrlRewriter, render_page, stream_page, parse_page
+from src.buildreport import BuildReport
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+class TestGeneratePagesIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nText")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def build(self, basepath="/", jobs=1, io_workers=0):
+        return generate_pages_incremental(self.content, self.template, self.dest, basepath, self.manifest, jobs, io_workers=io_workers)
+
+    def build_targets(self, io_workers=0):
+        targets = [
+            Target("/", self.dest, self.manifest),
+            Target("/ssg/", os.path.join(self.root, "mirror"), os.path.join(self.root, "mirror.json")),
+        ]
+        return generate_targets_incremental(self.content, self.template, targets, io_workers=io_workers)
+
+    def test_first_build_generates_everything(self):
+        self.assertEqual(self.build(), (2, 0, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_rebuild_skips_unchanged_pages(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 2, 0))
+
+    def test_changed_source_is_regenerated(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged text")
+        self.assertEqual(self.build(), (1, 1, 0))
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertIn("Changed text", f.read())
+
+    def test_template_or_basepath_change_rebuilds_all(self):
+        self.build()
+        self.assertEqual(self.build("/ssg/"), (2, 0, 0))
+        self.write(self.template, TEMPLATE + "<!-- v2 -->")
+        self.assertEqual(self.build("/ssg/"), (2, 0, 0))
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(self.build(), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.assertEqual(self.build(), (1, 1, 0))
+
+    def test_directory_layout_change_rebuilds_only_its_pages(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "layout.html"), "<main>{{ Content }}</main>")
+        self.assertEqual(self.build(), (1, 1, 0))
+        with open(os.path.join(self.dest, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<main><div><h1>Post</h1><p>Text</p></div></main>")
+
+    def test_parallel_build_matches_serial_build(self):
+        for i in range(6):
+            self.write(os.path.join(self.content, "more", f"page{i}.md"), f"# Page {i}\n\nBody {i}")
+        self.assertEqual(self.build(jobs=3), (8, 0, 0))
+        with open(os.path.join(self.dest, "more", "page4.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>Page 4</title><body><div><h1>Page 4</h1><p>Body 4</p></div></body>")
+
+    def test_async_pipeline_matches_serial_build(self):
+        for i in range(5):
+            self.write(os.path.join(self.content, "more", f"page{i}.md"), f"# Page {i}\n\nBody {i}")
+        self.assertEqual(self.build(io_workers=3), (7, 0, 0))
+        with open(os.path.join(self.dest, "more", "page3.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>Page 3</title><body><div><h1>Page 3</h1><p>Body 3</p></div></body>")
+
+    def test_async_pipeline_collects_failures(self):
+        self.write(os.path.join(self.content, "broken.md"), "no heading here")
+        with self.assertRaises(BuildError) as ctx:
+            self.build(io_workers=2)
+        self.assertEqual(len(ctx.exception.failures), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_async_pipeline_collects_undecodable_pages(self):
+        with open(os.path.join(self.content, "latin1.md"), "wb") as f:
+            f.write("# Caf\xe9".encode("latin-1"))
+        with self.assertRaises(BuildError) as ctx:
+            self.build(io_workers=2)
+        self.assertEqual(len(ctx.exception.failures), 1)
+        self.assertIn("UnicodeDecodeError", ctx.exception.failures[0][1])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_report_records_stages_for_rendered_pages(self):
+        report = BuildReport()
+        generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, report=report)
+        self.assertEqual(len(report.pages), 2)
+        for stages in report.pages.values():
+            self.assertEqual(set(stages), {"read", "blocks", "inline", "render"})
+
+    def test_failures_are_collected_and_retried(self):
+        self.write(os.path.join(self.content, "broken.md"), "no heading here")
+        with self.assertRaises(BuildError) as ctx:
+            self.build()
+        self.assertEqual([path for path, error in ctx.exception.failures], [os.path.join(self.content, "broken.md")])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.write(os.path.join(self.content, "broken.md"), "# Fixed")
+        self.assertEqual(self.build(), (1, 2, 0))
+
+    def test_asset_map_rewrites_references_and_rebuilds_on_change(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![cat](/images/cat.png)")
+        assets = {"/images/cat.png": "/images/cat.1a2b3c4d.png"}
+        generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets)
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertIn('src="/images/cat.1a2b3c4d.png"', f.read())
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets), (0, 2, 0))
+        # Only the page that shows the image refers to its fingerprinted name.
+        assets = {"/images/cat.png": "/images/cat.99999999.png", "/images/dog.png": "/images/dog.1a2b3c4d.png"}
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets), (1, 1, 0))
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertIn('src="/images/cat.99999999.png"', f.read())
+
+    def test_asset_in_the_template_rebuilds_every_page(self):
+        self.write(self.template, '<link href="/index.css" rel="stylesheet" />' + TEMPLATE)
+        assets = {"/index.css": "/index.1a2b3c4d.css", "/images/cat.png": "/images/cat.1a2b3c4d.png"}
+        generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets)
+        assets = {"/index.css": "/index.1a2b3c4d.css", "/images/cat.png": "/images/cat.99999999.png"}
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets), (0, 2, 0))
+        assets = {"/index.css": "/index.99999999.css", "/images/cat.png": "/images/cat.99999999.png"}
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, assets=assets), (2, 0, 0))
+        with open(os.path.join(self.dest, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertIn('href="/index.99999999.css"', f.read())
+
+    def test_minify_changes_output_and_rebuilds(self):
+        self.build()
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, minify=True), (2, 0, 0))
+        self.assertEqual(generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, minify=True), (0, 2, 0))
+
+    def test_manifest_records_page_selectors(self):
+        self.build()
+        with open(self.manifest, encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(pages["index.md"]["selectors"], ["body", "div", "h1", "p", "title"])
+
+    def test_manifest_records_links_with_source_lines(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nSee [post](/blog/post)\nand ![cat](cat.png) or [site](https://example.com)")
+        self.build("/ssg/")
+        with open(self.manifest, encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(pages["index.md"]["links"], [["/blog/post", 3], ["cat.png", 4]])
+        self.assertEqual(pages["blog/post.md"]["links"], [])
+
+    def test_inlined_styles_replace_the_stylesheet_link(self):
+        self.write(self.template, '<link href="/index.css" rel="stylesheet" />{{ Content }}')
+        generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, styles={"/index.css": "p{}"})
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<style>p{}</style><div><h1>Home</h1><p>Hello</p></div>")
+
+    def test_large_sources_are_streamed_with_the_same_output(self):
+        self.build()
+        with open(os.path.join(self.dest, "blog", "post.html"), encoding="utf-8") as f:
+            expected = f.read()
+        os.remove(os.path.join(self.dest, "blog", "post.html"))
+        report = BuildReport()
+        with mock.patch("src.generatepage.STREAM_THRESHOLD", 0):
+            generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, report=report)
+        self.assertEqual(list(report.pages[os.path.join(self.content, "blog", "post.md")]), ["stream"])
+        with open(os.path.join(self.dest, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_async_pipeline_streams_large_sources(self):
+        with mock.patch("src.asyncbuild.STREAM_THRESHOLD", 0), mock.patch("src.generatepage.STREAM_THRESHOLD", 0):
+            report = BuildReport()
+            generate_pages_incremental(self.content, self.template, self.dest, "/", self.manifest, report=report, io_workers=2)
+        self.assertEqual([list(stages) for stages in report.pages.values()], [["stream"], ["stream"]])
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>Home</title><body><div><h1>Home</h1><p>Hello</p></div></body>")
+
+    def test_basepath_leaves_code_blocks_alone(self):
+        self.write(os.path.join(self.content, "index.md"), '# Home\n\n[home](/)\n\n```\n<a href="/x">\n```')
+        self.build("/ssg/")
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn('<a href="/ssg/">home</a>', html)
+        self.assertIn('<code><a href="/x">\n</code>', html)
+
+    def test_title_comes_from_the_first_h1_block(self):
+        self.write(os.path.join(self.content, "index.md"), "```\n# not a title\n```\n\n# Real title\n\ntext")
+        self.build()
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith("<title>Real title</title>"))
+
+    def test_each_target_matches_a_separate_build(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)")
+        self.assertEqual(self.build_targets(), [(2, 0, 0), (2, 0, 0)])
+        with open(os.path.join(self.root, "mirror", "index.html"), encoding="utf-8") as f:
+            mirrored = f.read()
+        self.assertIn('href="/ssg/blog/post"', mirrored)
+        self.build("/ssg/")
+        with open(os.path.join(self.dest, "index.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), mirrored)
+
+    def test_each_page_is_parsed_once(self):
+        with mock.patch("src.generatepage.parse_page", wraps=parse_page) as parse:
+            self.build_targets()
+        self.assertEqual(parse.call_count, 2)
+
+    def test_targets_are_incremental_independently(self):
+        self.build_targets()
+        os.remove(os.path.join(self.root, "mirror", "index.html"))
+        self.assertEqual(self.build_targets(), [(0, 2, 0), (1, 1, 0)])
+
+    def test_async_pipeline_writes_every_target(self):
+        self.assertEqual(self.build_targets(io_workers=2), [(2, 0, 0), (2, 0, 0)])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "mirror", "blog", "post.html")))
+
+class TestStreamPage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_same_output(self, markdown, **options):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        expected = io.StringIO()
+        expected_stages, expected_info = render_page(markdown, self.template, expected, **options)
+        streamed = io.StringIO()
+        stages, info = stream_page(path, self.template, streamed, **options)
+        self.assertEqual(streamed.getvalue(), expected.getvalue())
+        self.assertEqual(info, expected_info)
+
+    def test_matches_in_memory_rendering(self):
+        self.assert_same_output("# Title\n\nSome **bold** text\nover two lines\n\n```\ncode\n\n  kept\n```\n\n- a\n- b\n\n> quote")
+
+    def test_title_after_other_blocks(self):
+        self.assert_same_output("Intro paragraph\n\n1. one\n2. two\n\n# Late title\n\ntail", basepath="/ssg/", minify=True)
+
+    def test_search_postings_match_in_memory_rendering(self):
+        self.assert_same_output("# Title\n\nthe road goes\n\n```\nskipped\n```\n\n- on and on the road", search=True)
+
+    def test_missing_title_raises(self):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("no heading")
+        with self.assertRaises(Exception):
+            stream_page(path, self.template, io.StringIO())
+
+class TestUrlRewriter(unittest.TestCase):
+    def test_assets_are_renamed_before_basepath_is_applied(self):
+        rewrite = UrlRewriter("/ssg/", {"/index.css": "/index.77c4ebdb.css"})
+        self.assertEqual(rewrite("/index.css"), "/ssg/index.77c4ebdb.css")
+        self.assertEqual(rewrite("/index.css#top"), "/ssg/index.77c4ebdb.css#top")
+        self.assertEqual(rewrite("/about"), "/ssg/about")
+        self.assertEqual(rewrite("https://example.com/"), "https://example.com/")
+
+    def test_template_markup_is_rewritten(self):
+        rewrite = UrlRewriter("/ssg/", {"/index.css": "/index.77c4ebdb.css"})
+        self.assertEqual(
+            rewrite.literal('<link href="/index.css" rel="stylesheet" /><link href=/index.css rel=stylesheet /><img src=/a.png>'),
+            '<link href="/ssg/index.77c4ebdb.css" rel="stylesheet" /><link href=/ssg/index.77c4ebdb.css rel=stylesheet /><img src=/ssg/a.png>',
+        )
+
+    def test_stylesheet_links_are_inlined(self):
+        rewrite = UrlRewriter(styles={"/index.css": "p{}"})
+        self.assertEqual(rewrite.literal('<link href="/index.css" rel="stylesheet" /><link href="/x.css" rel="stylesheet" />'), '<style>p{}</style><link href="/x.css" rel="stylesheet" />')
+
+class TestChunkPages(unittest.TestCase):
+    def test_chunks_keep_order_and_cover_all_pages(self):
+        pages = list(range(37))
+        chunks = chunk_pages(pages, 4)
+        self.assertEqual([p for chunk in chunks for p in chunk], pages)
+        self.assertGreater(len(chunks), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -115,5 +116,41 @@ class TestParentNode(unittest.TestCase):
         self.assertTrue(html.startswith('<a '))
         self.assertTrue(html.endswith('>Google</a>'))
 
+    def test_write_html_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hi "), LeafNode("a", "link", {"href": "/x"})]),
+            ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")])]),
+        ], props={"class": "c"})
+        sink = io.StringIO()
+        node.write_html(sink)
+        self.assertEqual(sink.getvalue(), node.to_html())
+
+    def test_iter_html_handles_very_deep_trees(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        self.assertEqual("".join(node.iter_html()), "<span>" * 5000 + "x" + "</span>" * 5000)
+
+    def test_minified_html_unquotes_props_and_collapses_text(self):
+        node = ParentNode("p", [
+            LeafNode(None, "Hello \n   world "),
+            LeafNode("a", "the  link", {"href": "/x", "title": "two words"}),
+            LeafNode("code", "a  =  b"),
+        ])
+        self.assertEqual(
+            "".join(node.iter_html(minify=True)),
+            '<p>Hello world <a href=/x title="two words">the link</a><code>a  =  b</code></p>',
+        )
+
+    def test_minified_html_preserves_pre_blocks(self):
+        node = ParentNode("div", [ParentNode("pre", [LeafNode("code", "if x:\n    y()\n")], {"class": "py"})])
+        sink = io.StringIO()
+        node.write_html(sink, minify=True)
+        self.assertEqual(sink.getvalue(), node.to_html())
+
+    def test_iter_html_children_with_none(self):
+        with self.assertRaises(AttributeError):
+            list(ParentNode("div", [None]).iter_html())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
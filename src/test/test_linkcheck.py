@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from src.generatepage import generate_pages_incremental
+from src.linkcheck import is_checked, block_links, page_links, site_index, resolve, find_broken_links, check_links
+from src.markdown import blocks_to_page
+from src.markdownblock import iter_blocks
+
+class TestLinkCheck(unittest.TestCase):
+    def test_only_internal_links_are_checked(self):
+        self.assertTrue(is_checked("/blog/"))
+        self.assertTrue(is_checked("images/a.png"))
+        self.assertFalse(is_checked("https://example.com/"))
+        self.assertFalse(is_checked("mailto:me@example.com"))
+        self.assertFalse(is_checked("//cdn.example.com/x.js"))
+        self.assertFalse(is_checked("#top"))
+
+    def test_links_carry_their_source_line(self):
+        markdown = "# Title\n\nintro [a](/a)\nmore ![b](/b.png) and [a](/a)\n\n```\n[c](/c)\n```\n\n- [d](/d)\n- [e](/e)"
+        blocks = list(iter_blocks(markdown.split("\n")))
+        title, node = blocks_to_page(blocks)
+        self.assertEqual(page_links(blocks, node), [["/a", 3], ["/b.png", 4], ["/a", 4], ["/d", 10], ["/e", 11]])
+
+    def test_blocks_without_link_syntax_are_skipped(self):
+        block = next(iter_blocks(["plain text"]))
+        self.assertEqual(block_links(block, None), [])
+
+    def test_site_index_covers_page_url_forms(self):
+        with tempfile.TemporaryDirectory() as root:
+            for rel_path in ("index.html", os.path.join("blog", "tom", "index.html"), "about.html", "index.css"):
+                path = os.path.join(root, rel_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, "w").close()
+            index = site_index(root, {"/logo.png": "/logo.1234abcd.png"})
+        self.assertEqual(index, {
+            "/", "/index.html", "/blog/tom", "/blog/tom/", "/blog/tom/index.html",
+            "/about", "/about.html", "/index.css", "/logo.png",
+        })
+
+    def test_resolve(self):
+        self.assertEqual(resolve("/blog/tom/#intro", "/index.html"), "/blog/tom/")
+        self.assertEqual(resolve("../images/a%20b.png?v=1", "/blog/tom/index.html"), "/blog/images/a b.png")
+        self.assertEqual(resolve("/", "/blog/index.html"), "/")
+        self.assertIsNone(resolve("?page=2", "/index.html"))
+
+    def test_find_broken_links(self):
+        pages = [("content/index.md", "/index.html", [["/blog/", 3], ["/missing", 5], ["blog/", 6]])]
+        self.assertEqual(find_broken_links(pages, {"/blog/"}), [("content/index.md", 5, "/missing")])
+
+class TestCheckLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(self.template, '<link href="/index.css" rel="stylesheet" />{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)\n\n[gone](/blog/gone)")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n![cat](/images/cat.png) [home](../index.html)")
+        self.write(os.path.join(self.dest, "images", "cat.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def check(self):
+        generate_pages_incremental(self.content, self.template, self.dest, "/ssg/", self.manifest)
+        return check_links(self.content, self.dest, self.manifest)
+
+    def test_dangling_links_are_reported_with_source_and_line(self):
+        checked, broken = self.check()
+        self.assertEqual(checked, 4)
+        self.assertEqual(broken, [(os.path.join(self.content, "index.md"), 5, "/blog/gone")])
+
+    def test_unchanged_pages_are_checked_from_the_manifest(self):
+        self.check()
+        os.remove(os.path.join(self.dest, "images", "cat.png"))
+        checked, broken = self.check()
+        self.assertEqual(len(broken), 2)
+        self.assertEqual(broken[0], (os.path.join(self.content, "blog", "post.md"), 3, "/images/cat.png"))
+
+if __name__ == "__main__":
+    unittest.main()
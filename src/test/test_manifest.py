@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from src.manifest import DeployManifest, file_record, hash_bytes, write_if_changed
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_file_record_reuses_hash_when_stat_matches(self):
+        path = os.path.join(self.root, "a.md")
+        with open(path, "w") as f:
+            f.write("hello")
+        record = file_record(path)
+        self.assertEqual(record["hash"], hash_bytes(b"hello"))
+        stale = dict(record, hash="cached")
+        self.assertEqual(file_record(path, stale)["hash"], "cached")
+
+    def test_write_if_changed_statuses(self):
+        path = os.path.join(self.root, "page.html")
+        self.assertEqual(write_if_changed(path, lambda f: f.write("<p>one</p>")), ("added", hash_bytes(b"<p>one</p>")))
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(write_if_changed(path, lambda f: f.write("<p>one</p>"))[0], "unchanged")
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        self.assertEqual(write_if_changed(path, lambda f: f.write("<p>two</p>"))[0], "changed")
+        with open(path) as f:
+            self.assertEqual(f.read(), "<p>two</p>")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_failed_write_keeps_existing_output(self):
+        path = os.path.join(self.root, "page.html")
+        write_if_changed(path, lambda f: f.write("old"))
+        def fail(f):
+            f.write("partial")
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            write_if_changed(path, fail)
+        with open(path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.root), ["page.html"])
+
+    def test_deploy_manifest(self):
+        deploy = DeployManifest(self.root)
+        deploy.record(os.path.join(self.root, "a", "index.html"), "added", "h1")
+        deploy.record(os.path.join(self.root, "b.html"), "changed", "h2")
+        deploy.record(os.path.join(self.root, "c.html"), "unchanged", "h3")
+        deploy.remove(os.path.join(self.root, "old.html"))
+        out = os.path.join(self.root, "deploy.json")
+        deploy.write(out)
+        with open(out) as f:
+            data = json.load(f)
+        self.assertEqual(data["added"], {"a/index.html": "h1"})
+        self.assertEqual(data["changed"], {"b.html": "h2"})
+        self.assertEqual(data["removed"], ["old.html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from src.markdown import markdown_to_html_node, text_to_children, extract_title
+from src.markdown import markdown_to_html_node, text_to_children, extract_title, blocks_to_page
+from src.markdownblock import iter_blocks
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
     def test_paragraphs(self):
@@ -32,6 +33,11 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nfirst\n\nsecond\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>first\n\nsecond\n</code></pre></div>")
+
     def test_heading(self):
         md = """
 # Heading 1
@@ -187,5 +193,15 @@ class TestExtractTitle(unittest.TestCase):
         title = extract_title(md)
         self.assertEqual(title, "")
 
+    def test_blocks_to_page_takes_title_from_first_h1(self):
+        md = "intro\n\n## Sub\n\n  # First **bold**\n\n# Second\n"
+        title, node = blocks_to_page(iter_blocks(md.split("\n")))
+        self.assertEqual(title, "First **bold**")
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_blocks_to_page_without_h1_raises(self):
+        with self.assertRaises(Exception):
+            blocks_to_page(iter_blocks(["## only a subheading"]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import unittest
-from src.markdownblock import markdown_to_blocks, block_to_block_type
+from src.markdownblock import markdown_to_blocks, block_to_block_type, iter_blocks
 
 class TestMarkdownBlock(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -48,6 +48,31 @@ This is the same paragraph on a new line
         expected = ["Block one.", "Block two."]
         self.assertEqual(markdown_to_blocks(markdown), expected)    
 
+class TestIterBlocks(unittest.TestCase):
+    def test_blocks_carry_type_and_line_range(self):
+        md = "# Title\nIntro text\nmore\n\n- a\n- b\n"
+        blocks = list(iter_blocks(md.split("\n")))
+        self.assertEqual([(b.type.name, b.start, b.end) for b in blocks], [
+            ("heading", 1, 1),
+            ("paragraph", 2, 3),
+            ("unordered_list", 5, 6),
+        ])
+
+    def test_fenced_code_keeps_blank_lines_and_headings(self):
+        md = "Before\n```\nline one\n\n# not a heading\n```\nAfter"
+        blocks = list(iter_blocks(md.split("\n")))
+        self.assertEqual([b.type.name for b in blocks], ["paragraph", "code", "paragraph"])
+        self.assertEqual(blocks[1].lines, ["```", "line one", "", "# not a heading", "```"])
+        self.assertEqual((blocks[1].start, blocks[1].end), (2, 6))
+
+    def test_single_line_fence(self):
+        blocks = list(iter_blocks(["```inline```", "text"]))
+        self.assertEqual([b.type.name for b in blocks], ["code", "paragraph"])
+
+    def test_accepts_file_lines_with_newlines(self):
+        blocks = list(iter_blocks(["# Title\n", "\n", "Body\r\n"]))
+        self.assertEqual([b.lines for b in blocks], [["# Title"], ["Body"]])
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_block_type_heading(self):
         block = "# Heading 1"
@@ -0,0 +1,28 @@
+import unittest
+from src.minify import minify_html, attribute
+
+class TestMinify(unittest.TestCase):
+    def test_indentation_between_tags_is_removed(self):
+        self.assertEqual(minify_html("<ul>\n  <li>a</li>\n  <li>b</li>\n</ul>"), "<ul><li>a</li><li>b</li></ul>")
+
+    def test_inline_spaces_are_collapsed_not_removed(self):
+        self.assertEqual(minify_html("<b>a</b>   <i>b</i>"), "<b>a</b> <i>b</i>")
+
+    def test_comments_are_dropped_but_conditional_comments_kept(self):
+        self.assertEqual(minify_html("<p>a<!-- note --></p><!--[if IE]><p>ie</p><![endif]-->"), "<p>a</p><!--[if IE]><p>ie</p><![endif]-->")
+
+    def test_optional_quotes_are_dropped(self):
+        self.assertEqual(minify_html('<a href="/x" title="a b" data-x="">y</a>'), '<a href=/x title="a b" data-x="">y</a>')
+        self.assertEqual(attribute("href", "/x"), " href=/x")
+        self.assertEqual(attribute("alt", "two words"), ' alt="two words"')
+
+    def test_quotes_are_kept_before_a_self_closing_slash(self):
+        self.assertEqual(minify_html('<link rel="stylesheet" href="/index.css"/>'), '<link rel=stylesheet href="/index.css"/>')
+        self.assertEqual(minify_html('<img src="a.png" />'), '<img src=a.png />')
+
+    def test_literals_with_preformatted_content_are_untouched(self):
+        html = "<pre>\n  keep   this\n</pre>"
+        self.assertEqual(minify_html(html), html)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import marshal
+import os
+import tempfile
+import unittest
+from src.markdown import markdown_to_html_node
+from src.parsecache import ParseCache, node_to_tuple, tuple_to_node
+
+MARKDOWN = "# Title\n\nSome **bold** and a [link](/x) and ![img](/i.png)\n\n- a\n- b\n\n```\ncode\n```"
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "ast"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tuple_round_trip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        self.assertEqual(tuple_to_node(node_to_tuple(node)).to_html(), node.to_html())
+
+    def test_rebuilt_nodes_keep_their_classes_and_shared_tags(self):
+        node = markdown_to_html_node(MARKDOWN)
+        rebuilt = tuple_to_node(marshal.loads(marshal.dumps(node_to_tuple(node))))
+        self.assertEqual(type(rebuilt.children[0]).__name__, type(node.children[0]).__name__)
+        self.assertIs(rebuilt.children[1].tag, node.children[1].tag)
+        self.assertIsNone(rebuilt.children[0].children[0].children)
+
+    def test_put_then_get(self):
+        node = markdown_to_html_node(MARKDOWN)
+        key = self.cache.key(MARKDOWN)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "Title", node, [["/about", 3]])
+        title, cached, links = self.cache.get(key)
+        self.assertEqual(title, "Title")
+        self.assertEqual(cached.to_html(), node.to_html())
+        self.assertEqual(links, [["/about", 3]])
+
+    def test_key_depends_on_content(self):
+        self.assertNotEqual(self.cache.key("a"), self.cache.key("b"))
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key(MARKDOWN)
+        os.makedirs(os.path.dirname(self.cache.path(key)))
+        with open(self.cache.path(key), "wb") as f:
+            f.write(b"not marshal")
+        self.assertIsNone(self.cache.get(key))
+
+    def test_evict_removes_least_recently_used(self):
+        node = markdown_to_html_node(MARKDOWN)
+        keys = [self.cache.key(str(i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, "T", node)
+            os.utime(self.cache.path(key), ns=(i * 10**9, i * 10**9))
+        size = os.path.getsize(self.cache.path(keys[0]))
+        self.cache.get(keys[0])
+        self.cache.max_bytes = size * 2
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+if __name__ == "__main__":
+    unittest.main()
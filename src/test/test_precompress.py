@@ -0,0 +1,98 @@
+import gzip
+import os
+import tempfile
+import unittest
+from src.precompress import precompress, drop_stale
+from src.manifest import DeployManifest
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "gzip.json")
+        self.write(os.path.join(self.docs, "index.html"), "<p>hello</p>" * 200)
+        self.write(os.path.join(self.docs, "blog", "post.html"), "<p>post</p>" * 200)
+        self.write(os.path.join(self.docs, "tiny.css"), "a{}")
+        self.write(os.path.join(self.docs, "image.png"), "png-bytes" * 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def run_precompress(self, deploy=None):
+        return precompress(self.docs, self.manifest, workers=2, deploy=deploy)[:3]
+
+    def test_text_outputs_get_gz_siblings(self):
+        self.assertEqual(self.run_precompress(), (2, 0, 1))
+        with gzip.open(os.path.join(self.docs, "index.html.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "image.png.gz")))
+
+    def test_files_that_do_not_shrink_are_skipped(self):
+        self.run_precompress()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "tiny.css.gz")))
+
+    def test_up_to_date_files_are_not_recompressed(self):
+        self.run_precompress()
+        self.assertEqual(self.run_precompress(), (0, 3, 0))
+        self.write(os.path.join(self.docs, "index.html"), "<p>changed</p>" * 200)
+        self.assertEqual(self.run_precompress(), (1, 2, 0))
+
+    def test_missing_sibling_is_rewritten(self):
+        self.run_precompress()
+        os.remove(os.path.join(self.docs, "blog", "post.html.gz"))
+        self.assertEqual(self.run_precompress(), (1, 2, 0))
+
+    def test_removed_output_takes_its_sibling_along(self):
+        self.run_precompress()
+        os.remove(os.path.join(self.docs, "blog", "post.html"))
+        deploy = DeployManifest(self.docs)
+        self.run_precompress(deploy)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertEqual(deploy.removed, ["blog/post.html.gz"])
+
+    def test_sibling_of_an_output_that_stops_shrinking_is_removed(self):
+        self.run_precompress()
+        self.write(os.path.join(self.docs, "index.html"), "<p>x</p>")
+        deploy = DeployManifest(self.docs)
+        self.assertEqual(self.run_precompress(deploy), (0, 2, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html.gz")))
+        self.assertEqual(deploy.removed, ["index.html.gz"])
+
+    def test_sibling_shares_the_original_mtime(self):
+        self.run_precompress()
+        path = os.path.join(self.docs, "index.html")
+        self.assertEqual(os.stat(path + ".gz").st_mtime_ns, os.stat(path).st_mtime_ns)
+
+    def test_rewritten_outputs_lose_their_siblings_without_gzip(self):
+        self.run_precompress()
+        deploy = DeployManifest(self.docs)
+        deploy.record(os.path.join(self.docs, "index.html"), "changed", "digest")
+        deploy.record(os.path.join(self.docs, "image.png"), "changed", "digest")
+        self.assertEqual(drop_stale(self.docs, deploy), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "blog", "post.html.gz")))
+        self.assertEqual(deploy.removed, ["index.html.gz"])
+        self.assertEqual(self.run_precompress(), (1, 2, 0))
+
+    def test_removed_outputs_lose_their_siblings_without_gzip(self):
+        self.run_precompress()
+        post = os.path.join(self.docs, "blog", "post.html")
+        os.remove(post)
+        deploy = DeployManifest(self.docs)
+        deploy.remove(post)
+        self.assertEqual(drop_stale(self.docs, deploy), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertEqual(deploy.removed, ["blog/post.html", "blog/post.html.gz"])
+
+    def test_savings_are_reported(self):
+        compressed, unchanged, skipped, saved, total = precompress(self.docs, self.manifest)
+        self.assertEqual(total, len("<p>hello</p>" * 200) + len("<p>post</p>" * 200))
+        self.assertGreater(saved, total // 2)
+
+if __name__ == "__main__":
+    unittest.main()
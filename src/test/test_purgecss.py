@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from src.htmlnode import LeafNode, ParentNode
+from src.purgecss import node_selectors, html_selectors, selector_requirements, parse_css, render_css, analyze_stylesheet, inline_styles, INLINE_LIMIT
+
+CSS = """
+/* base */
+body { margin: 0; }
+h1, h4 { color: red; }
+a:hover { color: blue; }
+pre code { padding: 0; }
+.note, #top { border: 1px solid; }
+::-webkit-scrollbar { width: 12px; }
+@media (max-width: 600px) { h4 { font-size: 1em; } p { margin: 0; } }
+@font-face { font-family: "X"; src: url("x.woff"); }
+"""
+
+class TestPurgeCSS(unittest.TestCase):
+    def test_node_selectors_collects_tags_classes_and_ids(self):
+        node = ParentNode("div", [LeafNode("p", "x", {"class": "note wide"}), LeafNode("a", "y", {"id": "top"})])
+        self.assertEqual(node_selectors(node), {"div", "p", "a", ".note", ".wide", "#top"})
+
+    def test_html_selectors_reads_template_markup(self):
+        self.assertEqual(html_selectors('<!doctype html><body class=page><main id="m">'), {"body", "main", ".page", "#m"})
+
+    def test_selector_requirements(self):
+        self.assertEqual(selector_requirements("pre code"), ["pre", "code"])
+        self.assertEqual(selector_requirements("a:hover"), ["a"])
+        self.assertEqual(selector_requirements("ul > li.item"), ["ul", "li", ".item"])
+        self.assertEqual(selector_requirements("::-webkit-scrollbar"), [])
+        self.assertEqual(selector_requirements("input[type=text]"), ["input"])
+
+    def test_unused_selectors_are_purged(self):
+        used = {"body", "h1", "a", "p", ".note"}
+        css = render_css(parse_css(CSS), used)
+        self.assertIn("h1{color: red;}", css)
+        self.assertIn(".note{border: 1px solid;}", css)
+        self.assertIn("::-webkit-scrollbar", css)
+        self.assertIn("@media (max-width: 600px){p{margin: 0;}}", css)
+        self.assertIn("@font-face", css)
+        self.assertNotIn("h4", css)
+        self.assertNotIn("pre code", css)
+        self.assertNotIn("#top", css)
+
+    def test_empty_media_blocks_are_dropped(self):
+        self.assertEqual(render_css(parse_css("@media print { h4 { color: red; } }"), {"p"}), "")
+
+    def test_analysis_is_cached_by_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.css")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(CSS)
+            cache_dir = os.path.join(tmp, "cache")
+            items = analyze_stylesheet(path, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertEqual(analyze_stylesheet(path, cache_dir), items)
+
+    def test_large_stylesheets_are_not_inlined(self):
+        self.assertEqual(inline_styles({"/a.css": "a{}"}), {"/a.css": "a{}"})
+        self.assertIsNone(inline_styles({"/a.css": "a" * (INLINE_LIMIT + 1)}))
+
+if __name__ == "__main__":
+    unittest.main()
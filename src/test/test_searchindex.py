@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+from src.generatepage import generate_pages_incremental
+from src.markdown import markdown_to_html_node
+from src.searchindex import add_postings, shard_name, encode_positions, page_url, SearchIndex
+
+class TestTokenizing(unittest.TestCase):
+    def test_positions_follow_the_text(self):
+        postings = {}
+        node = markdown_to_html_node("# The Hobbit\n\nThe **road** goes *ever* on\n\n```\ncode is skipped\n```\n\n- the end")
+        self.assertEqual(add_postings(postings, node), 9)
+        self.assertEqual(postings["the"], [0, 2, 7])
+        self.assertEqual(postings["road"], [3])
+        self.assertNotIn("code", postings)
+
+    def test_inline_markup_does_not_split_words(self):
+        postings = {}
+        add_postings(postings, markdown_to_html_node("un**break**able and `code`"))
+        self.assertEqual(postings, {"unbreakable": [0], "and": [1], "code": [2]})
+
+    def test_positions_continue_across_calls(self):
+        postings = {}
+        position = add_postings(postings, markdown_to_html_node("one two"))
+        add_postings(postings, markdown_to_html_node("two"), position)
+        self.assertEqual(postings["two"], [1, 2])
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("hobbit"), "ho")
+        self.assertEqual(shard_name("a"), "a")
+        self.assertEqual(shard_name("élan"), "_")
+
+    def test_encode_positions_uses_gaps(self):
+        self.assertEqual(encode_positions(7, [3, 10, 12]), [7, 3, 7, 2])
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "post.html"), "docs"), "blog/post.html")
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.state = os.path.join(self.root, "search.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHobbits live in the Shire")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nThe Shire is green")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, name):
+        with open(os.path.join(self.dest, "search", f"{name}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def build(self, search=True):
+        self.index = SearchIndex(self.dest, self.state) if search else None
+        return generate_pages_incremental(self.content, self.template, self.dest, "/ssg/", self.manifest, search_index=self.index)
+
+    def test_index_lists_pages_and_term_postings(self):
+        self.build()
+        self.assertEqual(self.read("pages")["pages"], [["blog/post.html", "Post"], ["", "Home"]])
+        self.assertEqual(self.read("sh")["shire"], [[0, 2], [1, 5]])
+        self.assertEqual(self.read("ho")["hobbits"], [[1, 1]])
+
+    def test_unchanged_pages_are_not_reindexed(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 2, 0))
+        self.assertEqual(self.index.written, 0)
+
+    def test_changed_page_only_rewrites_its_shards(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHobbits live in the Shire and Bree")
+        self.assertEqual(self.build(), (1, 1, 0))
+        self.assertEqual(self.read("br")["bree"], [[1, 7]])
+        self.assertEqual(self.read("sh")["shire"], [[0, 2], [1, 5]])
+
+    def test_removed_page_frees_its_id_for_the_next_page(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build()
+        self.assertEqual(self.read("pages")["pages"], [None, ["", "Home"]])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "gr.json")))
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nGreen hills")
+        self.build()
+        self.assertEqual(self.read("pages")["pages"], [["about.html", "About"], ["", "Home"]])
+        self.assertEqual(self.read("gr")["green"], [[0, 1]])
+
+    def test_page_edited_in_a_build_without_the_index_is_reindexed(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHobbits live in the Shire zzuniqueword")
+        self.assertEqual(self.build(search=False), (1, 1, 0))
+        self.assertEqual(self.build(), (0, 2, 0))
+        self.assertEqual(self.read("zz")["zzuniqueword"], [[1, 6]])
+
+    def test_enabling_the_index_indexes_pages_built_without_it(self):
+        self.build(search=False)
+        self.assertEqual(self.build(), (0, 2, 0))
+        self.assertEqual(len(self.read("pages")["pages"]), 2)
+
+if __name__ == "__main__":
+    unittest.main()
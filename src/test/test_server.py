@@ -0,0 +1,161 @@
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from src.server import make_server, parse_range, FileCache, LiveReload
+
+class TestStaticServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.write("index.html", b"<p>home</p>")
+        self.write("blog/index.html", b"<p>blog</p>" * 50)
+        self.write("index.css", b"body{}" * 100)
+        with open(os.path.join(self.root, "index.css.gz"), "wb") as f:
+            f.write(gzip.compress(b"body{}" * 100))
+        self.server = make_server(self.root, 0, host="127.0.0.1", access_log=False)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def request(self, path, method="GET", **headers):
+        self.conn.request(method, path, headers=headers)
+        response = self.conn.getresponse()
+        return response, response.read()
+
+    def test_serves_directory_index_with_validators(self):
+        response, body = self.request("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>home</p>")
+        self.assertIsNotNone(response.getheader("ETag"))
+        self.assertIsNotNone(response.getheader("Last-Modified"))
+
+    def test_connection_is_kept_alive(self):
+        self.request("/")
+        sock = self.conn.sock
+        response, body = self.request("/blog/")
+        self.assertEqual(body, b"<p>blog</p>" * 50)
+        self.assertIs(self.conn.sock, sock)
+
+    def test_matching_etag_returns_304(self):
+        response, body = self.request("/index.html")
+        response, body = self.request("/index.html", **{"If-None-Match": response.getheader("ETag")})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_if_modified_since_returns_304(self):
+        response, body = self.request("/index.html")
+        response, body = self.request("/index.html", **{"If-Modified-Since": response.getheader("Last-Modified")})
+        self.assertEqual(response.status, 304)
+
+    def test_changed_file_is_reread(self):
+        response, body = self.request("/index.html")
+        etag = response.getheader("ETag")
+        self.write("index.html", b"<p>changed home</p>")
+        response, body = self.request("/index.html", **{"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<p>changed home</p>")
+
+    def test_gzip_sibling_is_served_when_accepted(self):
+        response, body = self.request("/index.css", **{"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Content-Type"), "text/css")
+        self.assertEqual(gzip.decompress(body), b"body{}" * 100)
+        response, body = self.request("/index.css")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"body{}" * 100)
+
+    def test_gzip_sibling_older_than_the_original_is_ignored(self):
+        st = os.stat(os.path.join(self.root, "index.css.gz"))
+        self.write("index.css", b"body{color:red}" * 100)
+        os.utime(os.path.join(self.root, "index.css"), ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        response, body = self.request("/index.css", **{"Accept-Encoding": "gzip"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"body{color:red}" * 100)
+
+    def test_range_request_returns_partial_content(self):
+        response, body = self.request("/index.css", Range="bytes=6-11")
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"), "bytes 6-11/600")
+        self.assertEqual(body, b"body{}")
+
+    def test_unsatisfiable_range_returns_416(self):
+        response, body = self.request("/index.css", Range="bytes=900-")
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader("Content-Range"), "bytes */600")
+
+    def test_head_sends_headers_only(self):
+        response, body = self.request("/index.css", method="HEAD")
+        self.assertEqual(response.getheader("Content-Length"), "600")
+        self.assertEqual(body, b"")
+
+    def test_missing_file_returns_404(self):
+        response, body = self.request("/nope.html")
+        self.assertEqual(response.status, 404)
+
+    def dev_request(self, path):
+        server = make_server(self.root, 0, LiveReload(), host="127.0.0.1", access_log=False)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response, response.read()
+
+    def test_dev_server_injects_the_reload_script(self):
+        response, body = self.dev_request("/blog/")
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"__livereload", body)
+
+    def test_dev_server_redirects_directories_like_production(self):
+        response, body = self.dev_request("/blog")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/blog/")
+
+    def test_dev_server_page_removed_during_a_rebuild_returns_404(self):
+        with mock.patch.object(FileCache, "get", side_effect=FileNotFoundError):
+            response, body = self.dev_request("/index.html")
+        self.assertEqual(response.status, 404)
+
+class TestParseRange(unittest.TestCase):
+    def test_forms(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=50-500", 100), (50, 99))
+        self.assertEqual(parse_range("bytes=100-", 100), "unsatisfiable")
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 100))
+
+class TestFileCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for name in "abc":
+                path = os.path.join(root, name)
+                with open(path, "wb") as f:
+                    f.write(b"x" * 10)
+                paths.append(path)
+            cache = FileCache(max_bytes=25)
+            for path in paths:
+                cache.get(path)
+            self.assertEqual(list(cache.entries), paths[1:])
+            self.assertEqual(cache.total, 20)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from src.textnode import TextNode, TextType
-from src.splitnode import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+from src.splitnode import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes, text_to_textnodes_multipass
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_basic_code_split(self):
@@ -245,5 +245,20 @@ class TestTextToTextNodes(unittest.TestCase):
         expected = [TextNode("plain text", TextType.TEXT)]
         self.assertEqual(nodes, expected)
 
+    def test_single_pass_matches_multipass_on_edge_cases(self):
+        cases = [
+            "",
+            "unclosed `code",
+            "a **b `c` d** e",
+            "a _b**c_ d",
+            "**bold with [link](url)** and [link](url)",
+            "[outer ![img](a.png)](b)",
+            "![img](a_b.png) and [x](y_z)",
+            "***triple*** and `**not bold**`",
+            "!![img](a) [a](b)![c](d)",
+        ]
+        for text in cases:
+            self.assertEqual(text_to_textnodes(text), text_to_textnodes_multipass(text), text)
+
 if __name__ == "__main__":
     unittest.main()
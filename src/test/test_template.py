@@ -0,0 +1,84 @@
+import io
+import os
+import tempfile
+import unittest
+from src.template import compile_template, load_template, find_layout
+from src.htmlnode import ParentNode, LeafNode
+
+class TestTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_render_fills_placeholders(self):
+        path = self.write("t.html", "<title>{{ Title }}</title><p>{{Content}}</p>")
+        template = compile_template(path)
+        self.assertEqual(template.render({"Title": "Hi", "Content": "x"}), "<title>Hi</title><p>x</p>")
+
+    def test_write_streams_node_values(self):
+        path = self.write("t.html", "<title>{{ Title }}</title>{{ Content }}")
+        node = ParentNode("div", [LeafNode("p", "body")])
+        sink = io.StringIO()
+        compile_template(path).write(sink, {"Title": "T", "Content": node})
+        self.assertEqual(sink.getvalue(), "<title>T</title><div><p>body</p></div>")
+
+    def test_minified_write_strips_template_whitespace_and_comments(self):
+        path = self.write("t.html", '<!doctype html>\n<html>\n  <head>\n    <!-- styles -->\n    <link href="/index.css" rel="stylesheet" />\n  </head>\n  <body>{{ Content }}</body>\n</html>\n')
+        sink = io.StringIO()
+        compile_template(path).write(sink, {"Content": LeafNode("p", "a  b")}, minify=True)
+        self.assertEqual(sink.getvalue(), "<!doctype html><html><head><link href=/index.css rel=stylesheet /></head><body><p>a b</p></body></html>")
+
+    def test_unknown_placeholder_is_left_verbatim(self):
+        path = self.write("t.html", "{{ Title }} {{ Other }}")
+        self.assertEqual(compile_template(path).render({"Title": "Hi"}), "Hi {{ Other }}")
+
+    def test_values_are_not_rescanned(self):
+        path = self.write("t.html", "{{ Title }}|{{ Content }}")
+        self.assertEqual(compile_template(path).render({"Title": "{{ Content }}", "Content": "c"}), "{{ Content }}|c")
+
+    def test_include_partials(self):
+        self.write("partials/head.html", "<head>{{ Title }}</head>")
+        path = self.write("t.html", '<html>{% include "partials/head.html" %}<body>{{ Content }}</body></html>')
+        template = compile_template(path)
+        self.assertEqual(template.render({"Title": "T", "Content": "C"}), "<html><head>T</head><body>C</body></html>")
+        self.assertEqual(len(template.dependencies), 2)
+
+    def test_include_cycle_raises(self):
+        self.write("a.html", '{% include "b.html" %}')
+        path = self.write("b.html", '{% include "a.html" %}')
+        with self.assertRaises(Exception):
+            compile_template(path)
+
+    def test_load_template_is_cached_until_dependency_changes(self):
+        self.write("partial.html", "one")
+        path = self.write("t.html", '{% include "partial.html" %}')
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+        partial = self.write("partial.html", "two")
+        st = os.stat(partial)
+        os.utime(partial, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({}), "two")
+        self.assertNotEqual(second.fingerprint, first.fingerprint)
+
+    def test_find_layout_uses_nearest_directory(self):
+        default = self.write("template.html", "default")
+        layout = self.write("content/blog/layout.html", "blog")
+        self.write("content/blog/post/index.md", "# Post")
+        content = os.path.join(self.root, "content")
+        self.assertEqual(find_layout(os.path.join(content, "blog", "post", "index.md"), content, default), layout)
+        self.assertEqual(find_layout(os.path.join(content, "index.md"), content, default), default)
+
+if __name__ == "__main__":
+    unittest.main()
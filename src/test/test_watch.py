@@ -0,0 +1,64 @@
+import os
+import tempfile
+import threading
+import unittest
+from argparse import Namespace
+from unittest import mock
+from src.watch import snapshot, changed_paths, rebuild
+from src.server import LiveReload
+
+class TestSnapshot(unittest.TestCase):
+    def test_detects_added_modified_and_removed_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            a = os.path.join(root, "a.md")
+            b = os.path.join(root, "sub", "b.md")
+            os.makedirs(os.path.dirname(b))
+            for path in (a, b):
+                with open(path, "w") as f:
+                    f.write("x")
+            before = snapshot([root])
+            self.assertEqual(set(before), {a, b})
+            with open(a, "w") as f:
+                f.write("longer")
+            os.remove(b)
+            c = os.path.join(root, "c.md")
+            with open(c, "w") as f:
+                f.write("x")
+            self.assertEqual(changed_paths(before, snapshot([root])), {a, b, c})
+
+    def test_missing_paths_are_ignored(self):
+        self.assertEqual(snapshot(["does-not-exist"]), {})
+
+class TestRebuild(unittest.TestCase):
+    def rebuild(self, changes, **options):
+        args = Namespace(fingerprint_assets=False, purge_css=False, inline_css=False)
+        vars(args).update(options)
+        with mock.patch("src.watch.build") as build:
+            self.assertTrue(rebuild(args, changes))
+        return build.call_args.kwargs
+
+    def test_static_change_only_syncs_assets(self):
+        self.assertEqual(self.rebuild({os.path.join("static", "index.css")}), {"assets": True, "pages": False})
+
+    def test_static_change_renders_pages_when_they_refer_to_assets(self):
+        for option in ("fingerprint_assets", "purge_css", "inline_css"):
+            self.assertEqual(self.rebuild({os.path.join("static", "index.css")}, **{option: True}), {"assets": True, "pages": True})
+
+    def test_unexpected_errors_do_not_stop_the_watcher(self):
+        args = Namespace(fingerprint_assets=False, purge_css=False, inline_css=False)
+        with mock.patch("src.watch.build", side_effect=FileNotFoundError("partials/nav.html")):
+            self.assertFalse(rebuild(args, {os.path.join("content", "index.md")}))
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_after_notify(self):
+        livereload = LiveReload()
+        timer = threading.Timer(0.05, livereload.notify)
+        timer.start()
+        self.assertEqual(livereload.wait(0, timeout=5), 1)
+        timer.join()
+
+    def test_wait_times_out_without_changes(self):
+        self.assertEqual(LiveReload().wait(0, timeout=0.01), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+from buildreport import log, flush_logs
+from generatepage import BuildError
+from main import build, build_parser, parse_args
+from server import LiveReload, serve_in_background
+from template import load_template
+
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+
+def snapshot(paths):
+    # Polling with stat() keeps this stdlib-only; a few thousand files take a few ms.
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            st = os.stat(path)
+            state[path] = (st.st_mtime_ns, st.st_size)
+            continue
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                try:
+                    st = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                state[file_path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def changed_paths(old, new):
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+def watched_paths():
+    paths = [CONTENT_DIR, STATIC_DIR, TEMPLATE_PATH]
+    try:
+        paths.extend(load_template(TEMPLATE_PATH).dependencies)
+    except Exception:
+        pass
+    return paths
+
+def rebuild(args, changes):
+    static_prefix = STATIC_DIR + os.sep
+    assets = any(path.startswith(static_prefix) for path in changes)
+    # Fingerprinted names, purged selectors and inlined styles all end up in the pages,
+    # so with any of them on an asset change renders the pages as well.
+    pages = any(not path.startswith(static_prefix) for path in changes) or (
+        assets and (args.fingerprint_assets or args.purge_css or args.inline_css))
+    start = time.perf_counter()
+    try:
+        build(args, assets=assets, pages=pages)
+    except BuildError as e:
+        print(e, file=sys.stderr)
+        return False
+    except Exception as e:
+        # A half-saved file can fail anywhere (a missing include raises FileNotFoundError);
+        # report it and keep watching for the next save.
+        log.error(f"Rebuild failed: {type(e).__name__}: {e}")
+        flush_logs()
+        return False
+    log.info(f"Rebuilt {len(changes)} change(s) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    flush_logs()
+    return True
+
+def watch(args, livereload=None):
+    state = snapshot(watched_paths())
+    while True:
+        time.sleep(args.interval)
+        new_state = snapshot(watched_paths())
+        if new_state == state:
+            continue
+        # Debounce: editors often write a file in several steps, so wait until it settles.
+        while True:
+            time.sleep(args.debounce)
+            settled = snapshot(watched_paths())
+            if settled == new_state:
+                break
+            new_state = settled
+        changes = changed_paths(state, new_state)
+        state = new_state
+        if rebuild(args, changes) and livereload is not None:
+            livereload.notify()
+
+def main():
+    parser = build_parser()
+    parser.description = "Build the site, then rebuild changed pages and assets on save."
+    parser.add_argument("--port", type=int, default=8888, help="port for the live-reload dev server (0 disables it)")
+    parser.add_argument("--interval", type=float, default=0.2, help="seconds between filesystem polls")
+    parser.add_argument("--debounce", type=float, default=0.05, help="seconds a change must stay quiet before rebuilding")
+    args = parse_args(parser=parser)
+
+    try:
+        build(args)
+    except BuildError as e:
+        print(e, file=sys.stderr)
+
+    livereload = None
+    if args.port:
+        livereload = LiveReload()
+        outdir = args.targets[0][1]
+        serve_in_background(outdir, args.port, livereload)
+        log.info(f"Serving {outdir}/ on http://localhost:{args.port}/ with live reload")
+    log.info("Watching content/, static/ and template.html for changes (Ctrl+C to stop)")
+    flush_logs()
+    try:
+        watch(args, livereload)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()